@@ -0,0 +1,402 @@
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+import numpy as np
+from vector_index import _normalize_rows
+
+CENTROIDS_FILE = "centroids.f32"
+VECTORS_FILE = "vectors.f32"
+ASSIGNMENTS_FILE = "assignments.i32"
+RECORDS_FILE = "records.jsonl"
+PARAMS_FILE = "params.json"
+ROWS_FILE = "rows.idx"
+LOCK_FILE = "index.lock"
+
+# Per row: end offset of its line in records.jsonl and a hash of the candidate it belongs to
+ROW_DTYPE = np.dtype([("end", "<u8"), ("key", "<u8")])
+# Assignment of a row replaced by a newer embedding of the same candidate
+REMOVED = -1
+
+DEFAULT_NPROBE = 8
+DEFAULT_KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+
+
+def default_nlist(count):
+    """
+    Rule of thumb: about 4 * sqrt(n) inverted lists.
+    """
+    return max(1, int(4 * np.sqrt(count)))
+
+
+def candidate_key(record):
+    """
+    64-bit hash identifying the candidate of a record (its email, else its id).
+    """
+    value = str(record.get("email") or record.get("id") or "").strip().lower()
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+@contextmanager
+def _index_lock(index_dir):
+    """
+    Exclusive lock on an on-disk index, held across processes (e.g. the Streamlit app and
+    batch_ingest appending to the same EMBEDDING_ANN_INDEX_DIR) as well as threads.
+    """
+    with open(os.path.join(index_dir, LOCK_FILE), "a+b") as f:
+        try:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+        except ImportError:  # Windows
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            try:
+                import fcntl
+                fcntl.flock(f, fcntl.LOCK_UN)
+            except ImportError:
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# Per index directory: centroids and the latest row of each candidate, for append()
+_append_states = {}
+
+
+def _file_id(path):
+    stat = os.stat(path)
+    return stat.st_dev, stat.st_ino
+
+
+def _append_state(index_dir, count, nlist, dim):
+    """
+    Cached append state of index_dir, caught up with the first count rows on disk by
+    reading only the rows appended since the last call (by any process). Rebuilt when
+    save() has replaced the files. Also returns the earlier rows of candidates seen
+    again in the rows just read, which are still to be marked REMOVED.
+    """
+    rows_path = os.path.join(index_dir, ROWS_FILE)
+    centroids_path = os.path.join(index_dir, CENTROIDS_FILE)
+    file_ids = (_file_id(rows_path), _file_id(centroids_path))
+    state = _append_states.get(index_dir)
+    if state is None or state["files"] != file_ids or state["count"] > count:
+        state = _append_states[index_dir] = {
+            "files": file_ids,
+            "centroids": np.fromfile(centroids_path, dtype=np.float32).reshape(nlist, dim),
+            "count": 0,
+            "latest": {}
+        }
+
+    stale = []
+    if count > state["count"]:
+        keys = np.fromfile(rows_path, dtype=ROW_DTYPE, count=count - state["count"],
+                           offset=state["count"] * ROW_DTYPE.itemsize)["key"]
+        for row, key in enumerate(keys.tolist(), start=state["count"]):
+            if key in state["latest"]:
+                stale.append(state["latest"][key])
+            state["latest"][key] = row
+        state["count"] = count
+    return state, stale
+
+
+def _record_lines(records):
+    return [(json.dumps(record) + "\n").encode("utf-8") for record in records]
+
+
+def _train_centroids(vectors, nlist, iterations, seed):
+    """
+    Spherical k-means on a sample of the (normalized) vectors.
+    """
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty lists from random sample points so no list stays unused
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index over normalized embeddings.
+    Vectors are clustered into nlist lists around k-means centroids; a query scans only
+    the nprobe lists whose centroids are closest. Higher nprobe means higher recall and
+    slower queries; nprobe == nlist is exact search.
+    Rows replaced by a newer embedding of the same candidate keep their position but are
+    assigned to no list (REMOVED), so they are never returned.
+    """
+
+    def __init__(self, centroids, vectors, assignments, records, nprobe=DEFAULT_NPROBE):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.assignments = assignments
+        self.records = records
+        self.nprobe = nprobe
+        self._members = None
+
+    def __len__(self):
+        return int(np.count_nonzero(self.assignments != REMOVED))
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors, records, nlist=None, nprobe=DEFAULT_NPROBE,
+              iterations=DEFAULT_KMEANS_ITERATIONS, seed=0):
+        """
+        Train centroids on vectors (any scale; rows are normalized) and assign every row.
+        """
+        vectors = _normalize_rows(np.array(vectors, dtype=np.float32, order="C", copy=True))
+        if len(vectors) == 0:
+            raise ValueError("Cannot build an ANN index without vectors.")
+
+        nlist = min(nlist or default_nlist(len(vectors)), len(vectors))
+        centroids = _train_centroids(vectors, nlist, iterations, seed)
+        assignments = cls._assign(centroids, vectors)
+        return cls(centroids, vectors, assignments, list(records), nprobe)
+
+    @staticmethod
+    def _assign(centroids, vectors, block_size=8192):
+        assignments = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), block_size):
+            block = vectors[start:start + block_size]
+            assignments[start:start + block_size] = np.argmax(block @ centroids.T, axis=1)
+        return assignments
+
+    def _list_members(self):
+        if self._members is None:
+            order = np.argsort(self.assignments, kind="stable")
+            bounds = np.searchsorted(self.assignments[order], np.arange(self.nlist + 1))
+            self._members = [order[bounds[i]:bounds[i + 1]] for i in range(self.nlist)]
+        return self._members
+
+    def add(self, vector, record):
+        """
+        Insert one embedding into its nearest list without retraining, replacing any
+        earlier embedding of the same candidate.
+        """
+        row = _normalize_rows(np.array([vector], dtype=np.float32))
+        assignment = self._assign(self.centroids, row)
+        key = candidate_key(record)
+        stale = [i for i, existing in enumerate(self.records) if candidate_key(existing) == key]
+        self.vectors = np.concatenate([self.vectors, row])
+        self.assignments = np.concatenate([self.assignments, assignment])
+        self.assignments[stale] = REMOVED
+        self.records.append(record)
+        self._members = None
+
+    def search(self, query_embedding, top_k=5, nprobe=None):
+        """
+        Return approximately the top_k records by cosine similarity, best first.
+        """
+        if len(self) == 0 or top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        centroid_scores = self.centroids @ query
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe] if nprobe < self.nlist else range(self.nlist)
+
+        members = self._list_members()
+        candidates = np.concatenate([members[i] for i in probe])
+        if len(candidates) == 0:
+            return []
+
+        scores = self.vectors[candidates] @ query
+        top_k = min(top_k, len(scores))
+        best = np.argpartition(-scores, top_k - 1)[:top_k] if top_k < len(scores) else np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [dict(self.records[candidates[i]], score=float(scores[i])) for i in best]
+
+    def save(self, index_dir):
+        """
+        Write the index to index_dir. Vectors, assignments and records are append-only
+        files so single inserts can be persisted with IVFIndex.append().
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        lines = _record_lines(self.records)
+        rows = np.empty(len(lines), dtype=ROW_DTYPE)
+        rows["end"] = np.cumsum([len(line) for line in lines], dtype=np.uint64) if lines else []
+        rows["key"] = [candidate_key(record) for record in self.records]
+        files = {
+            CENTROIDS_FILE: np.ascontiguousarray(self.centroids, dtype=np.float32).tobytes(),
+            VECTORS_FILE: np.ascontiguousarray(self.vectors, dtype=np.float32).tobytes(),
+            ASSIGNMENTS_FILE: np.ascontiguousarray(self.assignments, dtype=np.int32).tobytes(),
+            RECORDS_FILE: b"".join(lines),
+            ROWS_FILE: rows.tobytes(),
+            PARAMS_FILE: json.dumps({
+                "dim": int(self.centroids.shape[1]),
+                "nlist": self.nlist,
+                "nprobe": self.nprobe
+            }).encode("utf-8")
+        }
+        for file_name, content in files.items():
+            path = os.path.join(index_dir, file_name)
+            with open(path + ".tmp", "wb") as f:
+                f.write(content)
+            os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def _ensure_rows_file(index_dir):
+        """
+        Build the row table once from records.jsonl for indexes saved before it existed.
+        """
+        rows_path = os.path.join(index_dir, ROWS_FILE)
+        if os.path.exists(rows_path):
+            return rows_path
+
+        with open(os.path.join(index_dir, RECORDS_FILE), "rb") as f:
+            lines = [line for line in f.readlines() if line.endswith(b"\n")]
+        rows = np.empty(len(lines), dtype=ROW_DTYPE)
+        rows["end"] = np.cumsum([len(line) for line in lines], dtype=np.uint64) if lines else []
+        rows["key"] = [candidate_key(json.loads(line)) for line in lines]
+        rows.tofile(rows_path)
+        return rows_path
+
+    @classmethod
+    def _consistent_rows(cls, index_dir, dim):
+        """
+        Number of complete rows on disk and the end offset of the last one in
+        records.jsonl; an interrupted append leaves the files uneven. Only file sizes and
+        the last entries of the row table are read.
+        """
+        rows_path = cls._ensure_rows_file(index_dir)
+        vector_rows = os.path.getsize(os.path.join(index_dir, VECTORS_FILE)) // (4 * dim)
+        assignment_rows = os.path.getsize(os.path.join(index_dir, ASSIGNMENTS_FILE)) // 4
+        records_size = os.path.getsize(os.path.join(index_dir, RECORDS_FILE))
+        count = min(vector_rows, assignment_rows, os.path.getsize(rows_path) // ROW_DTYPE.itemsize)
+        while count:
+            end = int(np.fromfile(rows_path, dtype=ROW_DTYPE, count=1, offset=(count - 1) * ROW_DTYPE.itemsize)["end"][0])
+            if end <= records_size:
+                return count, end
+            count -= 1
+        return 0, 0
+
+    @classmethod
+    def load(cls, index_dir):
+        """
+        Load an index written by save(); vectors are memory-mapped.
+        """
+        params_path = os.path.join(index_dir, PARAMS_FILE)
+        if not os.path.exists(params_path):
+            raise FileNotFoundError(f"No ANN index found in {index_dir}.")
+        with open(params_path, "r", encoding="utf-8") as f:
+            params = json.load(f)
+
+        dim, nlist = params["dim"], params["nlist"]
+        count, records_end = cls._consistent_rows(index_dir, dim)
+        with open(os.path.join(index_dir, RECORDS_FILE), "rb") as f:
+            records = [json.loads(line) for line in f.read(records_end).splitlines()]
+        centroids = np.fromfile(os.path.join(index_dir, CENTROIDS_FILE), dtype=np.float32).reshape(nlist, dim)
+        assignments = np.fromfile(os.path.join(index_dir, ASSIGNMENTS_FILE), dtype=np.int32, count=count)
+        if count:
+            vectors = np.memmap(os.path.join(index_dir, VECTORS_FILE), dtype=np.float32, mode="r", shape=(count, dim))
+        else:
+            vectors = np.zeros((0, dim), dtype=np.float32)
+        return cls(centroids, vectors, assignments, records, params["nprobe"])
+
+    @classmethod
+    def append(cls, index_dir, vector, record):
+        """
+        Persist a single insert by appending to the on-disk index, without loading the
+        vectors or parsing the records, under a cross-process lock. Earlier rows of the
+        same candidate are marked REMOVED, and any partially written row from an
+        interrupted append is dropped. The centroids and the latest row per candidate are
+        kept per process, so after the first append only rows added since are read.
+        """
+        with open(os.path.join(index_dir, PARAMS_FILE), "r", encoding="utf-8") as f:
+            params = json.load(f)
+        dim, nlist = params["dim"], params["nlist"]
+
+        row = _normalize_rows(np.array([vector], dtype=np.float32))
+        if row.shape[1] != dim:
+            raise ValueError(f"Embedding has dimension {row.shape[1]}, ANN index expects {dim}.")
+        line = _record_lines([record])[0]
+        key = candidate_key(record)
+
+        with _index_lock(index_dir):
+            count, records_end = cls._consistent_rows(index_dir, dim)
+            for file_name, size in ((VECTORS_FILE, count * dim * 4), (ASSIGNMENTS_FILE, count * 4),
+                                    (RECORDS_FILE, records_end), (ROWS_FILE, count * ROW_DTYPE.itemsize)):
+                with open(os.path.join(index_dir, file_name), "r+b") as f:
+                    f.truncate(size)
+
+            state, stale = _append_state(index_dir, count, nlist, dim)
+            new_row = np.array([(records_end + len(line), key)], dtype=ROW_DTYPE)
+
+            # The row table is written last: a row only counts once all its parts exist
+            with open(os.path.join(index_dir, VECTORS_FILE), "ab") as f:
+                f.write(row.tobytes())
+            with open(os.path.join(index_dir, ASSIGNMENTS_FILE), "ab") as f:
+                f.write(cls._assign(state["centroids"], row).tobytes())
+            with open(os.path.join(index_dir, RECORDS_FILE), "ab") as f:
+                f.write(line)
+            with open(os.path.join(index_dir, ROWS_FILE), "ab") as f:
+                f.write(new_row.tobytes())
+
+            # Retire the candidate's older rows only once the new one is in place
+            if key in state["latest"]:
+                stale.append(state["latest"][key])
+            state["latest"][key] = count
+            state["count"] = count + 1
+            if stale:
+                assignments = np.memmap(os.path.join(index_dir, ASSIGNMENTS_FILE), dtype=np.int32, mode="r+",
+                                        shape=(count + 1,))
+                assignments[stale] = REMOVED
+                assignments.flush()
+                del assignments
+
+
+def recall_report(ann_index, exact_index, queries, k_values=(1, 10), nprobes=(1, 2, 4, 8, 16, 32)):
+    """
+    Compare ANN search with exact VectorIndex search over the given query vectors.
+    Returns one row per (nprobe, k) with recall@k and mean/p95 query latency in
+    milliseconds, plus the exact search latency for reference.
+    """
+    def timed(search):
+        results, latencies = [], []
+        for query in queries:
+            start = time.perf_counter()
+            results.append(search(query))
+            latencies.append((time.perf_counter() - start) * 1000)
+        return results, np.array(latencies)
+
+    rows = []
+    for k in k_values:
+        exact_results, exact_ms = timed(lambda q: exact_index.search(q, top_k=k))
+        exact_ids = [{r["id"] for r in result} for result in exact_results]
+        for nprobe in nprobes:
+            if nprobe > ann_index.nlist:
+                continue
+            ann_results, ann_ms = timed(lambda q: ann_index.search(q, top_k=k, nprobe=nprobe))
+            recall = np.mean([
+                len(expected & {r["id"] for r in result}) / max(len(expected), 1)
+                for expected, result in zip(exact_ids, ann_results)
+            ])
+            rows.append({
+                "nprobe": nprobe,
+                "k": k,
+                "recall": float(recall),
+                "mean_ms": float(ann_ms.mean()),
+                "p95_ms": float(np.percentile(ann_ms, 95)),
+                "exact_mean_ms": float(exact_ms.mean())
+            })
+    return rows
@@ -0,0 +1,47 @@
+import os
+import threading
+import streamlit as st
+
+# Long-lived resources for the Streamlit pages, built on first use and then shared by
+# every session and rerun in the process. The Blob, Search and OpenAI clients are already
+# process-wide singletons in their service modules (get_blob_storage, get_search_client,
+# get_session), which prewarm() builds ahead of time.
+
+
+@st.cache_resource(show_spinner="Loading candidate index...")
+def vector_index():
+    from embedding_service import load_vector_index
+    return load_vector_index()
+
+
+@st.cache_resource(show_spinner=False)
+def metrics_server():
+    import instrumentation
+    return instrumentation.start_metrics_server()
+
+
+@st.cache_resource(show_spinner=False)
+def prewarm():
+    """
+    Once per process, import the service SDKs and build their clients on a background
+    thread, so the first Generate Resume click or search does not pay for them. Configuration
+    errors are left to surface when the feature is actually used. Set APP_PREWARM=0 to
+    load everything on demand instead (e.g. when measuring startup).
+    """
+    if os.environ.get("APP_PREWARM", "1") == "0":
+        return None
+
+    def build():
+        from azure_blob_storage import get_blob_storage
+        from azure_openai_client import get_session
+        from search_service import get_search_client
+        import resume_pipeline  # noqa: F401  (pulls in the embedding service)
+        for get_client in (get_session, get_blob_storage, get_search_client):
+            try:
+                get_client()
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=build, daemon=True, name="prewarm")
+    thread.start()
+    return thread
@@ -1,22 +1,80 @@
 from azure.storage.blob import BlobServiceClient
+from azure.core.exceptions import ResourceExistsError
+from azure.core.pipeline.transport import RequestsTransport
+from concurrent.futures import ThreadPoolExecutor
 import os
+import threading
+import requests
+import instrumentation
+
+DEFAULT_MAX_CONCURRENCY = 16
+RESUME_CONTAINER = "resumes"  # Use any container name you prefer
+
+
+def resume_file_name(email):
+    return f"{email.replace('@', '_').replace('.', '_')}_resume.txt"
+
+
+def _byte_size(content):
+    # The SDK uploads str as UTF-8, so count the encoded bytes, not the characters
+    return len(content.encode("utf-8")) if isinstance(content, str) else len(content)
+
+
 class AzureBlobStorage:
-    def __init__(self):
-        connection_string = os.environ.get("AZURE_STORAGE_CONNECTION_STRING")
-        if not connection_string:
-            raise ValueError("Azure Storage connection string is not set in environment variables.")
-        self.blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+    def __init__(self, max_concurrency=None, blob_service_client=None):
+        self.max_concurrency = max_concurrency or int(
+            os.environ.get("AZURE_STORAGE_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+        )
+
+        if blob_service_client is None:
+            connection_string = os.environ.get("AZURE_STORAGE_CONNECTION_STRING")
+            if not connection_string:
+                raise ValueError("Azure Storage connection string is not set in environment variables.")
+
+            # One keep-alive session sized for the bulk thread pool, so concurrent requests
+            # reuse connections instead of opening a new TLS handshake each time.
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=self.max_concurrency)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            transport = RequestsTransport(session=session, session_owner=False)
+
+            blob_service_client = BlobServiceClient.from_connection_string(connection_string, transport=transport)
+
+        self.blob_service_client = blob_service_client
+        self._known_containers = set()
+        self._containers_lock = threading.Lock()
+
+    def get_container_client(self, container_name):
+        """
+        Return a container client, creating the container on first use. The existence check
+        is cached per instance so repeated writes do not pay an extra round trip.
+        """
+        container_client = self.blob_service_client.get_container_client(container_name)
+        if container_name in self._known_containers:
+            return container_client
+
+        with self._containers_lock:
+            if container_name not in self._known_containers:
+                if not container_client.exists():
+                    try:
+                        container_client.create_container()
+                    except ResourceExistsError:
+                        pass
+                self._known_containers.add(container_name)
+        return container_client
 
     def upload_resume(self, container_name, file_name, content):
         """
         Existing method to upload a JSON or text file to Azure Blob Storage.
         """
-        container_client = self.blob_service_client.get_container_client(container_name)
-        if not container_client.exists():
-            container_client.create_container()
+        container_client = self.get_container_client(container_name)
 
         blob_client = container_client.get_blob_client(file_name)
-        blob_client.upload_blob(content, overwrite=True)
+        with instrumentation.span("blob_upload", container=container_name):
+            blob_client.upload_blob(content, overwrite=True)
+        if instrumentation.enabled():
+            instrumentation.count("blob_bytes_total", _byte_size(content), container=container_name, direction="upload")
         return f"File stored successfully: {container_name}/{file_name}"
 
     def download_resume(self, container_name, file_name):
@@ -24,22 +82,109 @@ class AzureBlobStorage:
         Existing method to download a file from Azure Blob Storage.
         """
         blob_client = self.blob_service_client.get_blob_client(container_name, file_name)
-        if not blob_client.exists():
-            raise FileNotFoundError(f"The file {file_name} does not exist in container {container_name}.")
-        return blob_client.download_blob().readall()
+        with instrumentation.span("blob_download", container=container_name):
+            if not blob_client.exists():
+                raise FileNotFoundError(f"The file {file_name} does not exist in container {container_name}.")
+            data = blob_client.download_blob().readall()
+        instrumentation.count("blob_bytes_total", len(data), container=container_name, direction="download")
+        return data
 
     def store_resume(self, email, resume_text):
         """
         New method: store the plain text resume separately from embeddings.
         """
-        container_name = "resumes"  # Use any container name you prefer
-        container_client = self.blob_service_client.get_container_client(container_name)
-        if not container_client.exists():
-            container_client.create_container()
+        container_name = RESUME_CONTAINER
+        container_client = self.get_container_client(container_name)
 
-        file_name = f"{email.replace('@', '_').replace('.', '_')}_resume.txt"
+        file_name = resume_file_name(email)
         blob_client = container_client.get_blob_client(file_name)
-        blob_client.upload_blob(resume_text, overwrite=True)
+        with instrumentation.span("blob_upload", container=container_name):
+            blob_client.upload_blob(resume_text, overwrite=True)
+        if instrumentation.enabled():
+            instrumentation.count("blob_bytes_total", _byte_size(resume_text), container=container_name,
+                                  direction="upload")
         return f"Resume stored successfully: {container_name}/{file_name}"
-    
-    
\ No newline at end of file
+
+    def resume_url(self, email):
+        """
+        URL of the stored plain-text resume for email.
+        """
+        return self.blob_service_client.get_blob_client(RESUME_CONTAINER, resume_file_name(email)).url
+
+    def download_blobs(self, container_name, file_names, max_concurrency=None):
+        """
+        Download many blobs concurrently over the shared client.
+        Returns the contents as bytes in the same order as file_names.
+        """
+        container_client = self.blob_service_client.get_container_client(container_name)
+
+        def download(file_name):
+            return container_client.get_blob_client(file_name).download_blob().readall()
+
+        file_names = list(file_names)
+        with instrumentation.span("blob_bulk_download", container=container_name) as span:
+            span.set("blobs", len(file_names))
+            contents = self._map(download, file_names, max_concurrency)
+        if instrumentation.enabled():
+            instrumentation.count("blob_bytes_total", sum(len(data) for data in contents),
+                                  container=container_name, direction="download")
+        return contents
+
+    def upload_blobs(self, container_name, files, max_concurrency=None):
+        """
+        Upload many (file_name, content) pairs concurrently, overwriting existing blobs.
+        Returns one status message per file, in input order.
+        """
+        container_client = self.get_container_client(container_name)
+
+        def upload(item):
+            file_name, content = item
+            container_client.get_blob_client(file_name).upload_blob(content, overwrite=True)
+            return f"File stored successfully: {container_name}/{file_name}"
+
+        files = list(files)
+        with instrumentation.span("blob_bulk_upload", container=container_name) as span:
+            span.set("blobs", len(files))
+            results = self._map(upload, files, max_concurrency)
+        if instrumentation.enabled():
+            instrumentation.count("blob_bytes_total", sum(_byte_size(content) for _, content in files),
+                                  container=container_name, direction="upload")
+        return results
+
+    def delete_blobs(self, container_name, file_names, max_concurrency=None):
+        """
+        Delete many blobs concurrently. Returns one status message per file, in input order.
+        """
+        container_client = self.blob_service_client.get_container_client(container_name)
+
+        def delete(file_name):
+            container_client.get_blob_client(file_name).delete_blob()
+            return f"File deleted successfully: {container_name}/{file_name}"
+
+        file_names = list(file_names)
+        with instrumentation.span("blob_bulk_delete", container=container_name) as span:
+            span.set("blobs", len(file_names))
+            return self._map(delete, file_names, max_concurrency)
+
+    def _map(self, func, items, max_concurrency):
+        workers = min(max_concurrency or self.max_concurrency, len(items))
+        if workers <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items))
+
+
+_shared_storage = None
+_shared_storage_lock = threading.Lock()
+
+
+def get_blob_storage():
+    """
+    Return the process-wide AzureBlobStorage, constructing it on first use.
+    """
+    global _shared_storage
+    if _shared_storage is None:
+        with _shared_storage_lock:
+            if _shared_storage is None:
+                _shared_storage = AzureBlobStorage()
+    return _shared_storage
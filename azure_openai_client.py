@@ -0,0 +1,154 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import requests
+import instrumentation
+
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 120
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_CAP = 30
+DEFAULT_REQUESTS_PER_SECOND = 10
+RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills at `rate` tokens per second up to `capacity`, and
+    acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def try_acquire(self):
+        """
+        Take a token if one is available right now; never blocks.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+_session = None
+_buckets = {}
+_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the process-wide keep-alive session used for all Azure OpenAI calls.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _bucket_for(deployment_name):
+    with _lock:
+        bucket = _buckets.get(deployment_name)
+        if bucket is None:
+            rate = float(os.environ.get("AZURE_OPENAI_REQUESTS_PER_SECOND", DEFAULT_REQUESTS_PER_SECOND))
+            bucket = _buckets[deployment_name] = TokenBucket(rate)
+        return bucket
+
+
+def _retry_after(response):
+    """
+    Seconds to wait as requested by the service, from retry-after-ms or Retry-After.
+    """
+    retry_after_ms = response.headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = response.headers.get("Retry-After")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt):
+    # Full jitter: spread retries from concurrent workers instead of retrying in lockstep.
+    return random.uniform(0, min(DEFAULT_BACKOFF_CAP, DEFAULT_BACKOFF_BASE * 2 ** attempt))
+
+
+def post(deployment_name, url, headers, payload, stream=False):
+    """
+    POST a JSON payload to an Azure OpenAI deployment over the shared session.
+    Requests are rate limited per deployment, and throttling (429), transient server errors
+    and connection failures are retried with exponential backoff that honours Retry-After.
+    The final response is returned for the caller to check, as with requests.post.
+    Request time (up to the response headers) and retries are recorded as metrics.
+    """
+    timeout = (
+        float(os.environ.get("AZURE_OPENAI_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)),
+        float(os.environ.get("AZURE_OPENAI_READ_TIMEOUT", DEFAULT_READ_TIMEOUT))
+    )
+    max_retries = int(os.environ.get("AZURE_OPENAI_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+    session = get_session()
+    bucket = _bucket_for(deployment_name)
+
+    with instrumentation.span("openai_request", deployment=deployment_name) as span:
+        for attempt in range(max_retries + 1):
+            bucket.acquire()
+            try:
+                response = session.post(url, headers=headers, json=payload, timeout=timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == max_retries:
+                    raise
+                delay = _backoff(attempt)
+                reason = "connection"
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                    span.set("status", response.status_code)
+                    span.set("attempts", attempt + 1)
+                    return response
+                retry_after = _retry_after(response)
+                delay = retry_after if retry_after is not None else _backoff(attempt)
+                reason = str(response.status_code)
+                response.close()
+
+            instrumentation.count("openai_retries_total", deployment=deployment_name, reason=reason)
+            time.sleep(delay)
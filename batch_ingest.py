@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+from resume_pipeline import persist_resume
+from resume_service import generate_resume
+
+DEFAULT_WORKERS = 8
+TRANSCRIPT_EXTENSIONS = (".txt",)
+AUDIO_EXTENSIONS = (".wav",)
+
+
+def read_items(source):
+    """
+    Read candidate items from a JSONL file or a directory.
+    JSONL lines are objects with "id" (optional), "email", "phone" (optional) and either
+    "transcript" or "audio" (path to a WAV file). In a directory, every .txt transcript or
+    .wav recording is one candidate with the file name (without extension) as its id. Its
+    email and phone come from a <name>.json sidecar ({"email": ..., "phone": ...}), or the
+    file name is the email itself (e.g. jane@example.com.txt).
+    """
+    if os.path.isdir(source):
+        for file_name in sorted(os.listdir(source)):
+            stem, extension = os.path.splitext(file_name)
+            path = os.path.join(source, file_name)
+            if extension.lower() in TRANSCRIPT_EXTENSIONS:
+                item = {"id": stem, "transcript_path": path}
+            elif extension.lower() in AUDIO_EXTENSIONS:
+                item = {"id": stem, "audio": path}
+            else:
+                continue
+            sidecar_path = os.path.join(source, stem + ".json")
+            if os.path.exists(sidecar_path):
+                with open(sidecar_path, "r", encoding="utf-8") as f:
+                    sidecar = json.load(f)
+                item.update({key: sidecar[key] for key in ("email", "phone") if sidecar.get(key)})
+            elif "@" in stem:
+                item["email"] = stem
+            yield item
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            item.setdefault("id", item.get("email") or str(line_number))
+            if item.get("audio") and not os.path.isabs(item["audio"]):
+                item["audio"] = os.path.join(base_dir, item["audio"])
+            yield item
+
+
+def read_checkpoint(path):
+    """
+    Ids already ingested successfully according to the checkpoint file.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # A line cut short by an interrupted run
+            if entry.get("status") == "succeeded":
+                done.add(entry["id"])
+    return done
+
+
+def ingest_item(item, executor):
+    """
+    Run transcribe (audio only) -> generate -> store/embed/index for one candidate and
+    return per-stage timings in seconds.
+    """
+    timings = {}
+    # Resumes and embeddings are stored under the email, so an id must not stand in for it
+    email = (item.get("email") or "").strip()
+    if "@" not in email:
+        raise ValueError(f"No email address for candidate {item['id']}; set \"email\" in its JSONL line "
+                         f"or {item['id']}.json sidecar.")
+
+    start = time.perf_counter()
+    if item.get("audio"):
+        # Imported here so transcript-only runs do not need the Speech SDK
+        from transcription_service import transcribe_wav_file
+        text = transcribe_wav_file(item["audio"])
+        timings["transcribe"] = time.perf_counter() - start
+    elif item.get("transcript_path"):
+        with open(item["transcript_path"], "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = item.get("transcript", "")
+    if not text.strip():
+        raise ValueError("No transcript text for this candidate.")
+
+    start = time.perf_counter()
+    resume_text = generate_resume(text, email=email, phone=item.get("phone", ""))
+    timings["generate_resume"] = time.perf_counter() - start
+
+    run = persist_resume(email, resume_text, executor=executor)
+    run.wait()
+    for stage_name, stage in run.stages.items():
+        if stage["seconds"] is not None:
+            timings[stage_name] = stage["seconds"]
+        if stage["status"] != "succeeded":
+            raise Exception(f"{stage_name} {stage['status']}: {stage['error']}")
+    return timings
+
+
+def _report(stage_timings, succeeded, failed, elapsed):
+    print(f"Ingested {succeeded} candidates ({failed} failed) in {elapsed:.1f}s "
+          f"= {succeeded / elapsed if elapsed else 0:.2f} items/sec")
+    for stage_name, values in stage_timings.items():
+        values = np.array(values) * 1000
+        print(f"  {stage_name:<20} n={len(values):<6} mean={values.mean():8.1f}ms "
+              f"p50={np.percentile(values, 50):8.1f}ms p95={np.percentile(values, 95):8.1f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate, store and index resumes for a backlog of candidates.")
+    parser.add_argument("source", help="Directory of .txt/.wav files, or a JSONL file of candidates.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Candidates processed concurrently.")
+    parser.add_argument("--checkpoint", default="ingest_checkpoint.jsonl",
+                        help="Checkpoint file; candidates recorded as succeeded are skipped on re-run.")
+    parser.add_argument("--progress-every", type=int, default=25, help="Print progress every N candidates.")
+    args = parser.parse_args(argv)
+
+    done = read_checkpoint(args.checkpoint)
+    items = [item for item in read_items(args.source) if item["id"] not in done]
+    print(f"{len(items)} candidates to ingest ({len(done)} already done according to {args.checkpoint}).")
+
+    stage_timings = {}
+    succeeded = failed = 0
+    checkpoint_lock = threading.Lock()
+    started = time.perf_counter()
+
+    # Persistence stages of every worker share one pool sized for the worker count
+    with ThreadPoolExecutor(max_workers=args.workers * 3) as stage_executor, \
+            ThreadPoolExecutor(max_workers=args.workers) as executor, \
+            open(args.checkpoint, "a", encoding="utf-8") as checkpoint:
+        futures = {executor.submit(ingest_item, item, stage_executor): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                timings = future.result()
+                entry = {"id": item["id"], "status": "succeeded", "timings": timings}
+                succeeded += 1
+                for stage_name, seconds in timings.items():
+                    stage_timings.setdefault(stage_name, []).append(seconds)
+            except Exception as e:
+                entry = {"id": item["id"], "status": "failed", "error": str(e)}
+                failed += 1
+                print(f"Failed to ingest {item['id']}: {e}", file=sys.stderr)
+
+            with checkpoint_lock:
+                checkpoint.write(json.dumps(entry) + "\n")
+                checkpoint.flush()
+
+            processed = succeeded + failed
+            if args.progress_every and processed % args.progress_every == 0:
+                elapsed = time.perf_counter() - started
+                print(f"{processed}/{len(items)} processed, {processed / elapsed:.2f} items/sec")
+
+    _report(stage_timings, succeeded, failed, time.perf_counter() - started)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+import datetime
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from azure_openai_client import TokenBucket
+
+
+class ServiceProfile:
+    """
+    Simulated service behaviour: per-request latency with jitter, an optional throughput
+    cap in requests per second, and a rate of injected throttling (429) responses.
+    """
+
+    def __init__(self, latency_ms=50, jitter_ms=10, max_rps=None, throttle_rate=0.0, retry_after=0.1, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._bucket = TokenBucket(max_rps) if max_rps else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def should_throttle(self):
+        """
+        Decide whether to answer this request with a 429.
+        """
+        if self._bucket is not None and not self._bucket.try_acquire():
+            return True
+        with self._lock:
+            return self._random.random() < self.throttle_rate
+
+    def wait(self):
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+    def wait_throughput(self):
+        """
+        Block for a throughput token; used by in-process fakes whose SDK would retry anyway.
+        """
+        if self._bucket is not None:
+            self._bucket.acquire()
+        self.wait()
+
+
+def fake_embedding(text, dim):
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class FakeOpenAIServer:
+    """
+    Local HTTP stand-in for Azure OpenAI embeddings and chat completions (including the
+    streaming mode). Point AZURE_OPENAI_ENDPOINT at `endpoint` to use it. Generated
+    resumes are resume_words placeholder words, or the words of resume_text if given.
+    """
+
+    def __init__(self, profile=None, embedding_dim=1536, resume_words=300, token_ms=2, resume_text=None):
+        self.profile = profile or ServiceProfile()
+        self.embedding_dim = embedding_dim
+        self.resume_words = resume_words
+        self.resume_text = resume_text
+        self.token_ms = token_ms
+        self.requests = 0
+        self.throttled = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        # Clients dropping streamed responses early reset connections; that is not an error here
+        self._server.handle_error = lambda request, client_address: None
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Keep-alive responses are written in several small sends; with Nagle's algorithm
+            # they wait on the client's delayed ACK (~40ms) and distort the latencies
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, body, headers=None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                path = re.sub(r"/+", "/", self.path.split("?")[0])
+                fake.requests += 1
+
+                if fake.profile.should_throttle():
+                    fake.throttled += 1
+                    self._send_json(429, {"error": {"code": "429", "message": "Rate limit exceeded."}},
+                                    {"Retry-After": str(fake.profile.retry_after)})
+                    return
+                fake.profile.wait()
+
+                if path.endswith("/embeddings"):
+                    self._embeddings(payload)
+                elif path.endswith("/chat/completions"):
+                    self._chat(payload)
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown path {path}"}})
+
+            def _embeddings(self, payload):
+                inputs = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+                self._send_json(200, {
+                    "data": [
+                        {"index": i, "embedding": fake_embedding(text, fake.embedding_dim)}
+                        for i, text in enumerate(inputs)
+                    ],
+                    "usage": {"prompt_tokens": sum(len(text) // 4 for text in inputs)}
+                })
+
+            def _chat(self, payload):
+                words = fake.resume_text.split() if fake.resume_text else [f"word{i}" for i in range(fake.resume_words)]
+                usage = {"prompt_tokens": sum(len(m["content"]) // 4 for m in payload["messages"]),
+                         "completion_tokens": len(words)}
+                if payload.get("response_format", {}).get("type") == "json_object":
+                    # Transcript condensation: a small facts object per chunk
+                    facts = {"name": "Candidate", "contact": {"email": "", "phone": "", "location": ""},
+                             "skills": words[:5], "achievements": words[5:8], "experience": words[8:10],
+                             "education": words[10:11]}
+                    self._send_json(200, {
+                        "choices": [{"message": {"role": "assistant", "content": json.dumps(facts)}}],
+                        "usage": usage
+                    })
+                    return
+                if not payload.get("stream"):
+                    self._send_json(200, {
+                        "choices": [{"message": {"role": "assistant", "content": " ".join(words)}}],
+                        "usage": usage
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    for word in words:
+                        chunk = {"choices": [{"delta": {"content": word + " "}}]}
+                        # Like Azure: raw UTF-8 and no charset in the Content-Type
+                        self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                        time.sleep(fake.token_ms / 1000)
+                    if payload.get("stream_options", {}).get("include_usage"):
+                        self.wfile.write(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode("utf-8"))
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client stopped reading, e.g. after the first token
+
+        return Handler
+
+
+class _BlobProperties:
+    def __init__(self, name, etag, last_modified):
+        self.name = name
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class _FakeDownload:
+    def __init__(self, data):
+        self._data = data
+
+    def readall(self):
+        return self._data
+
+
+class FakeBlobClient:
+    def __init__(self, container, name):
+        self._container = container
+        self.name = name
+        self.url = f"https://fake.blob.core.windows.net/{container.name}/{name}"
+
+    def upload_blob(self, data, overwrite=False, **kwargs):
+        self._container.service.profile.wait_throughput()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._container.put(self.name, data)
+
+    def download_blob(self, **kwargs):
+        from azure.core.exceptions import ResourceNotFoundError
+        self._container.service.profile.wait_throughput()
+        data = self._container.blobs.get(self.name)
+        if data is None:
+            raise ResourceNotFoundError(f"The blob {self.name} does not exist.")
+        return _FakeDownload(data[0])
+
+    def exists(self):
+        self._container.service.profile.wait_throughput()
+        return self.name in self._container.blobs
+
+    def delete_blob(self, **kwargs):
+        self._container.service.profile.wait_throughput()
+        self._container.blobs.pop(self.name, None)
+
+
+class FakeContainerClient:
+    def __init__(self, service, name):
+        self.service = service
+        self.name = name
+        self.blobs = {}  # name -> (data, etag, last_modified)
+        self.created = False
+        self._etags = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def put(self, name, data):
+        with self._lock:
+            self.blobs[name] = (data, f"0x{next(self._etags):x}", datetime.datetime.now(datetime.timezone.utc))
+
+    def exists(self):
+        self.service.profile.wait_throughput()
+        return self.created
+
+    def create_container(self):
+        self.service.profile.wait_throughput()
+        self.created = True
+
+    def list_blobs(self, name_starts_with=None, **kwargs):
+        self.service.profile.wait_throughput()
+        with self._lock:
+            items = sorted(self.blobs.items())
+        return [
+            _BlobProperties(name, etag, last_modified)
+            for name, (_, etag, last_modified) in items
+            if not name_starts_with or name.startswith(name_starts_with)
+        ]
+
+    def get_blob_client(self, name):
+        return FakeBlobClient(self, name)
+
+
+class FakeBlobServiceClient:
+    """
+    In-memory stand-in for azure.storage.blob.BlobServiceClient covering the calls the
+    services make. Every network call sleeps according to the profile.
+    """
+
+    def __init__(self, profile=None):
+        self.profile = profile or ServiceProfile(latency_ms=20, jitter_ms=5)
+        self._containers = {}
+        self._lock = threading.Lock()
+
+    def get_container_client(self, container_name):
+        with self._lock:
+            if container_name not in self._containers:
+                self._containers[container_name] = FakeContainerClient(self, container_name)
+            return self._containers[container_name]
+
+    def get_blob_client(self, container, blob):
+        return self.get_container_client(container).get_blob_client(blob)
+
+
+class _FakeSearchResults(list):
+    def __init__(self, documents, count):
+        super().__init__(documents)
+        self._count = count
+
+    def get_answers(self):
+        return []
+
+    def get_count(self):
+        return self._count
+
+
+class FakeSearchClient:
+    """
+    Stand-in for azure.search.documents.SearchClient returning synthetic resumes.
+    """
+
+    def __init__(self, profile=None, document_count=1000, content_chars=2000):
+        self.profile = profile or ServiceProfile(latency_ms=80, jitter_ms=20)
+        self.documents = [
+            {"id": f"doc{i}", "content": f"Resume {i} " + "x" * content_chars, "name": f"Candidate {i}"}
+            for i in range(document_count)
+        ]
+
+    def search(self, search_text="*", select=None, top=50, skip=0, **kwargs):
+        self.profile.wait_throughput()
+        results = []
+        for document in self.documents[skip:skip + top]:
+            result = {field: document.get(field) for field in (select or document)}
+            result["@search.rerankerScore"] = 1.0
+            results.append(result)
+        return _FakeSearchResults(results, len(self.documents))
@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import instrumentation
+from benchmarks import startup
+from benchmarks.fakes import FakeBlobServiceClient, FakeOpenAIServer, FakeSearchClient, ServiceProfile
+
+DEFAULT_TOLERANCE = 0.2
+
+
+class Elapsed(float):
+    """
+    Returned by a stage function to record this latency (seconds) instead of its wall time.
+    """
+
+
+def install_fakes(args):
+    """
+    Point every service at local fakes. Must run before the service modules are used.
+    """
+    openai_server = FakeOpenAIServer(
+        ServiceProfile(args.openai_latency_ms, args.jitter_ms, args.openai_max_rps, args.throttle_rate, seed=args.seed),
+        embedding_dim=args.embedding_dim,
+        token_ms=args.token_ms
+    ).start()
+
+    os.environ.update({
+        "AZURE_OPENAI_ENDPOINT": openai_server.endpoint,
+        "AZURE_OPENAI_API_KEY": "benchmark",
+        "AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME": "embedding",
+        "AZURE_OPENAI_RESUME_DEPLOYMENT_NAME": "resume",
+        "AZURE_SEARCH_ENDPOINT": "https://fake.search.windows.net",
+        "AZURE_SEARCH_API_KEY": "benchmark",
+        "EMBEDDING_CACHE_PATH": "",
+    })
+    os.environ.setdefault("AZURE_OPENAI_REQUESTS_PER_SECOND", "1000")
+    os.environ.pop("EMBEDDING_ANN_INDEX_DIR", None)
+
+    import azure_blob_storage
+    import search_service
+    blob_service_client = FakeBlobServiceClient(ServiceProfile(args.blob_latency_ms, args.jitter_ms / 2, seed=args.seed))
+    azure_blob_storage._shared_storage = azure_blob_storage.AzureBlobStorage(blob_service_client=blob_service_client)
+    search_service._search_client = FakeSearchClient(ServiceProfile(args.search_latency_ms, args.jitter_ms, seed=args.seed))
+    return openai_server, blob_service_client
+
+
+def seed_embeddings(blob_service_client, count, dim, versions=2):
+    """
+    Fill the fake embeddings container with `versions` timestamped embeddings per candidate.
+    """
+    container = blob_service_client.get_container_client("embeddings")
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        for version in range(versions):
+            name = f"candidate{i}_example_com_embedding_2025010{version + 1}_000000.json"
+            record = {"email": f"candidate{i}@example.com", "embedding": rng.standard_normal(dim).round(6).tolist(),
+                      "resume_url": ""}
+            container.put(name, json.dumps(record).encode("utf-8"))
+
+
+def measure(name, func, iterations, concurrency):
+    """
+    Call func(i) for i in range(iterations) on `concurrency` threads and summarize the
+    latencies. func may return an Elapsed to report e.g. time to first token instead.
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            measured = func(i)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        elapsed = measured if isinstance(measured, Elapsed) else time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(iterations)))
+    wall = time.perf_counter() - started
+
+    values = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    result = {
+        "stage": name,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "throughput_per_s": len(latencies) / wall if wall else 0.0
+    }
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+def build_stages(args, blob_service_client):
+    """
+    Return (name, func, iterations, concurrency) for every benchmarked stage.
+    """
+    from azure_blob_storage import get_blob_storage
+    from embedding_service import (download_all_embeddings, generate_embedding, generate_embeddings,
+                                   sync_embeddings)
+    from resume_pipeline import persist_resume
+    from resume_service import generate_resume, generate_resume_stream
+    from search_service import search_candidates, search_candidates_page
+    import tempfile
+
+    blob_storage = get_blob_storage()
+    sync_dir = tempfile.mkdtemp(prefix="bench-sync-")
+    resume_text = "Experienced warehouse operative with forklift licence. " * 40
+    n, c = args.iterations, args.concurrency
+
+    def first_token(i):
+        start = time.perf_counter()
+        for _ in generate_resume_stream(f"Candidate {i} story", email=f"c{i}@example.com"):
+            return Elapsed(time.perf_counter() - start)
+
+    def end_to_end(i):
+        text = generate_resume(f"Candidate {i} story", email=f"e2e{i}@example.com")
+        run = persist_resume(f"e2e{i}@example.com", text)
+        run.wait()
+        if run.status != "succeeded":
+            raise Exception(f"Pipeline {run.status}: {run.stages}")
+
+    rerun_times = []
+
+    def startup_rerun(i):
+        # One fresh app serves every iteration; AppTest reruns are sequential anyway
+        if not rerun_times:
+            rerun_times.extend(startup.probe(reruns=n)["reruns"])
+        return Elapsed(rerun_times[i])
+
+    sync_embeddings(sync_dir)  # Warm the sync store so the stage measures an unchanged refresh
+
+    return [
+        ("openai.generate_embedding", lambda i: generate_embedding(f"{resume_text} {i} {time.time()}"), n, c),
+        ("openai.generate_embedding.cached", lambda i: generate_embedding(resume_text), n, c),
+        ("openai.generate_embeddings.batch64",
+         lambda i: generate_embeddings([f"{resume_text} {i} {j} {time.time()}" for j in range(64)]), max(1, n // 8), c),
+        ("openai.generate_resume", lambda i: generate_resume(f"Candidate {i} story"), n, c),
+        ("openai.generate_resume_stream.first_token", first_token, n, c),
+        ("openai.generate_resume.long_transcript",
+         lambda i: generate_resume(f"Session {i}. " + resume_text * 50), max(1, n // 4), c),
+        ("blob.upload_resume", lambda i: blob_storage.store_resume(f"bench{i}@example.com", resume_text), n, c),
+        ("blob.download_resume", lambda i: blob_storage.download_resume("resumes", f"bench{i % n}_example_com_resume.txt"), n, c),
+        ("blob.upload_blobs.100",
+         lambda i: blob_storage.upload_blobs("bulk", [(f"{i}-{j}.txt", resume_text) for j in range(100)]), max(1, n // 10), 1),
+        ("embeddings.download_all", lambda i: download_all_embeddings(), max(1, n // 10), 1),
+        ("embeddings.download_latest", lambda i: download_all_embeddings(latest_only=True), max(1, n // 10), 1),
+        ("embeddings.sync_unchanged", lambda i: sync_embeddings(sync_dir), max(1, n // 10), 1),
+        ("search.search_candidates", lambda i: search_candidates(f"query {i}", top_k=50, use_cache=False), n, c),
+        ("search.search_candidates.cached", lambda i: search_candidates("popular query", top_k=50), n, c),
+        ("search.search_candidates_page", lambda i: search_candidates_page(f"query {i}", page=0, use_cache=False), n, c),
+        ("e2e.generate_and_persist", end_to_end, n, c),
+        ("startup.first_run", lambda i: Elapsed(startup.probe(reruns=0)["first_run"]), max(1, n // 20), 1),
+        ("startup.rerun", startup_rerun, n, 1),
+    ]
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Stages whose p95 latency grew, or throughput fell, by more than tolerance.
+    """
+    previous = {row["stage"]: row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        before = previous.get(row["stage"])
+        if before is None:
+            continue
+        if before["p95_ms"] and row["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{row['stage']}: p95 {before['p95_ms']:.1f}ms -> {row['p95_ms']:.1f}ms")
+        if before["throughput_per_s"] and row["throughput_per_s"] < before["throughput_per_s"] * (1 - tolerance):
+            regressions.append(f"{row['stage']}: throughput {before['throughput_per_s']:.1f}/s -> "
+                               f"{row['throughput_per_s']:.1f}/s")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'stage':<44} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'errors':>6}")
+    for row in results:
+        print(f"{row['stage']:<44} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} "
+              f"{row['throughput_per_s']:>9.1f} {row['errors']:>6}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume pipeline against local fake Azure services.")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--stages", nargs="*", help="Only run stages whose name starts with one of these prefixes.")
+    parser.add_argument("--candidates", type=int, default=500, help="Candidates seeded into the embeddings container.")
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    parser.add_argument("--openai-latency-ms", type=float, default=150)
+    parser.add_argument("--blob-latency-ms", type=float, default=20)
+    parser.add_argument("--search-latency-ms", type=float, default=80)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--token-ms", type=float, default=2, help="Delay between streamed chat tokens.")
+    parser.add_argument("--openai-max-rps", type=float, help="Throughput cap of the fake OpenAI service (429 above it).")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of OpenAI requests answered with 429.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--save-baseline", help="Write results as the new baseline JSON.")
+    parser.add_argument("--compare", help="Baseline JSON to compare against; exits 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--metrics", help="Enable instrumentation and write Prometheus-format metrics to this file.")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        instrumentation.configure(True)
+
+    openai_server, blob_service_client = install_fakes(args)
+    try:
+        seed_embeddings(blob_service_client, args.candidates, args.embedding_dim)
+        results = []
+        for name, func, iterations, concurrency in build_stages(args, blob_service_client):
+            if args.stages and not any(name.startswith(prefix) for prefix in args.stages):
+                continue
+            results.append(measure(name, func, iterations, concurrency))
+            print(f"  finished {name}", file=sys.stderr)
+    finally:
+        openai_server.stop()
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "save_baseline", "compare", "metrics")},
+        "openai_requests": openai_server.requests,
+        "openai_throttled": openai_server.throttled,
+        "results": results
+    }
+    print_table(results)
+    print(f"Fake OpenAI served {openai_server.requests} requests, {openai_server.throttled} throttled.")
+
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(instrumentation.render_prometheus())
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_SCRIPT = "speech_recognition.py"
+DEFAULT_RERUNS = 10
+DEFAULT_BUDGET_MS = 1500
+# SDKs the entry page must not load until the feature that needs them is used
+DEFERRED_MODULES = (
+    "azure.cognitiveservices.speech",
+    "azure.search.documents",
+    "azure.storage.blob",
+    "resume_service",
+    "resume_pipeline",
+    "embedding_service",
+    "transcription_service",
+)
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_loaded = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+app.run()
+first_run = time.perf_counter()
+reruns = []
+for _ in range(int(sys.argv[2])):
+    started = time.perf_counter()
+    app.run()
+    reruns.append(time.perf_counter() - started)
+print(json.dumps({
+    "streamlit_import": streamlit_loaded - start,
+    "first_run": first_run - streamlit_loaded,
+    "reruns": reruns,
+    "loaded": [name for name in json.loads(sys.argv[3]) if name in sys.modules],
+    "exceptions": [str(exception.value) for exception in app.exception],
+}))
+"""
+
+
+def probe(script=DEFAULT_SCRIPT, reruns=DEFAULT_RERUNS):
+    """
+    Run the page in a fresh interpreter with Streamlit's AppTest and return the Streamlit
+    import time, the first script run (cold imports of the app's own modules), each
+    rerun, and which deferred modules were loaded by the end. Background prewarming is
+    disabled so the measurement only covers what a render itself imports.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, APP_PREWARM="0")
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE, script, str(reruns), json.dumps(DEFERRED_MODULES)],
+        cwd=root, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold start and rerun time of a Streamlit page.")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT)
+    parser.add_argument("--reruns", type=int, default=DEFAULT_RERUNS)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Fail if the first run (excluding Streamlit's own import) takes longer.")
+    args = parser.parse_args(argv)
+
+    result = probe(args.script, args.reruns)
+    reruns = sorted(result["reruns"]) or [0.0]
+    print(f"Streamlit import   {result['streamlit_import'] * 1000:8.1f} ms")
+    print(f"First run          {result['first_run'] * 1000:8.1f} ms")
+    print(f"Rerun (median)     {reruns[len(reruns) // 2] * 1000:8.1f} ms")
+    print(f"Rerun (max)        {reruns[-1] * 1000:8.1f} ms")
+
+    failures = []
+    if result["exceptions"]:
+        failures.append(f"the page raised: {result['exceptions']}")
+    if result["loaded"]:
+        failures.append(f"deferred modules loaded at startup: {', '.join(result['loaded'])}")
+    if result["first_run"] * 1000 > args.budget_ms:
+        failures.append(f"first run took {result['first_run'] * 1000:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import argparse
+import csv
+import json
+import sys
+import numpy as np
+from embedding_service import generate_embeddings, load_vector_index
+
+DEFAULT_JOB_BATCH_SIZE = 256
+DEFAULT_CANDIDATE_BLOCK_SIZE = 16384
+
+
+def _merge_top_k(best_scores, best_rows, block_scores, block_offset, top_k):
+    """
+    Merge one block of scores into the running per-job top-k (unsorted).
+    """
+    block_rows = np.broadcast_to(
+        np.arange(block_offset, block_offset + block_scores.shape[1]), block_scores.shape
+    )
+    scores = np.concatenate([best_scores, block_scores], axis=1)
+    rows = np.concatenate([best_rows, block_rows], axis=1)
+    if scores.shape[1] <= top_k:
+        return scores, rows
+    keep = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    return np.take_along_axis(scores, keep, axis=1), np.take_along_axis(rows, keep, axis=1)
+
+
+def match_jobs(jobs, index, top_k=10, job_batch_size=DEFAULT_JOB_BATCH_SIZE,
+               candidate_block_size=DEFAULT_CANDIDATE_BLOCK_SIZE):
+    """
+    Match many job descriptions against every candidate in a VectorIndex.
+    jobs is an iterable of (job_id, text). Jobs are embedded in batches and scored against
+    candidates in blocks, so memory stays at job_batch_size x candidate_block_size scores
+    however many jobs and candidates there are. Yields (job_id, matches) per job, with
+    matches being the top_k candidate records with scores, best first.
+    """
+    top_k = min(top_k, len(index))
+    jobs = iter(jobs)
+
+    while True:
+        batch = [job for _, job in zip(range(job_batch_size), jobs)]
+        if not batch:
+            return
+        if top_k <= 0:
+            for job_id, _ in batch:
+                yield job_id, []
+            continue
+
+        queries = np.asarray(generate_embeddings([text for _, text in batch]), dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        queries /= norms
+
+        best_scores = np.full((len(batch), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(batch), 0), dtype=np.int64)
+        for start in range(0, len(index), candidate_block_size):
+            block_scores = queries @ index.vectors[start:start + candidate_block_size].T
+            best_scores, best_rows = _merge_top_k(best_scores, best_rows, block_scores, start, top_k)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        for (job_id, _), scores, rows in zip(batch, best_scores, best_rows):
+            yield job_id, [dict(index.records[row], score=float(score)) for score, row in zip(scores, rows)]
+
+
+def read_jobs(path):
+    """
+    Read jobs from a JSONL file (objects with "id" and "text" or "description") or from a
+    text file with one job description per line. Yields (job_id, text) lazily. JSONL jobs
+    without any text are skipped with a warning, as the embeddings API rejects empty input.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                job = json.loads(line)
+                job_id = str(job.get("id", line_number))
+                text = str(job.get("text") or job.get("description") or "").strip()
+                if not text:
+                    print(f"Skipping job {job_id} (line {line_number}): no text or description.", file=sys.stderr)
+                    continue
+                yield job_id, text
+            else:
+                yield str(line_number), line
+
+
+def write_matches(matches, output, output_format):
+    """
+    Stream (job_id, matches) pairs to a CSV or JSONL file object, one job at a time.
+    """
+    if output_format == "csv":
+        writer = csv.writer(output)
+        writer.writerow(["job_id", "rank", "email", "resume_url", "score"])
+    count = 0
+    for job_id, job_matches in matches:
+        if output_format == "csv":
+            for rank, match in enumerate(job_matches, start=1):
+                writer.writerow([job_id, rank, match["email"], match["resume_url"], f"{match['score']:.6f}"])
+        else:
+            output.write(json.dumps({"job_id": job_id, "matches": job_matches}) + "\n")
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match job descriptions against all stored candidates.")
+    parser.add_argument("jobs", help="JSONL file of jobs ({\"id\", \"text\"}) or a text file with one job per line.")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout).")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Output format (default: from --output extension, else csv).")
+    parser.add_argument("--top-k", type=int, default=10, help="Candidates kept per job.")
+    parser.add_argument("--index-dir", help="Local vector index directory (default: EMBEDDING_INDEX_DIR or vector_index).")
+    parser.add_argument("--job-batch-size", type=int, default=DEFAULT_JOB_BATCH_SIZE)
+    parser.add_argument("--candidate-block-size", type=int, default=DEFAULT_CANDIDATE_BLOCK_SIZE)
+    args = parser.parse_args(argv)
+
+    output_format = args.format or ("jsonl" if args.output and args.output.endswith(".jsonl") else "csv")
+    index = load_vector_index(args.index_dir)
+    matches = match_jobs(read_jobs(args.jobs), index, args.top_k, args.job_batch_size, args.candidate_block_size)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as output:
+            count = write_matches(matches, output, output_format)
+    else:
+        count = write_matches(matches, sys.stdout, output_format)
+    print(f"Matched {count} jobs against {len(index)} candidates.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
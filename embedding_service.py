@@ -1,22 +1,60 @@
 import os
-import requests
 import json
+import re
+import struct
+import numpy as np
 from datetime import datetime
-from azure_blob_storage import AzureBlobStorage
-from azure.search.documents import SearchClient
-from azure.core.credentials import AzureKeyCredential
+from urllib.parse import quote
+import azure_openai_client
+import instrumentation
+from ann_index import IVFIndex, PARAMS_FILE
+from azure_blob_storage import get_blob_storage
+from embedding_cache import cache_key, get_embedding_cache
+from vector_index import VectorIndex
+from azure.core.exceptions import ResourceNotFoundError
 
-def generate_embedding(text):
-    """
-    Generate an embedding for the given text using Azure OpenAI (text-embedding-3-small-march21).
-    """
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _ENCODING = None
+
+SYNC_MANIFEST_FILE = "manifest.json"
+SYNC_BLOBS_DIR = "blobs"
+
+# Binary embedding shards: header, JSON record sidecar, optional per-row scales, packed rows.
+SHARD_MAGIC = b"JCEB"
+SHARD_VERSION = 1
+SHARD_HEADER = struct.Struct("<4sHBxIII")  # magic, version, dtype code, count, dim, metadata length
+SHARD_DTYPES = {"float16": 1, "int8": 2}
+SHARD_PREFIX = "shards/"
+DEFAULT_SHARD_SIZE = 10000
+
+SNAPSHOT_BLOB = "snapshots/latest-embeddings.jceb"
+ARCHIVE_CONTAINER = "embeddings-archive"
+
+# Per-deployment request limits; override through the environment if the deployment allows more.
+DEFAULT_EMBEDDING_MAX_INPUTS = 16
+DEFAULT_EMBEDDING_MAX_INPUT_TOKENS = 8191
+DEFAULT_EMBEDDING_MAX_REQUEST_TOKENS = 100000
+
+
+def _embedding_settings():
     endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
     api_key = os.environ.get("AZURE_OPENAI_API_KEY")
     deployment_name = os.environ.get("AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME")
 
     if not endpoint or not api_key or not deployment_name:
         raise ValueError("Azure OpenAI environment variables for embedding generation are not set correctly.")
+    return endpoint, api_key, deployment_name
 
+
+def _request_embeddings(inputs):
+    """
+    Send one embeddings request for a string or a list of strings and return the vectors
+    in input order.
+    """
+    endpoint, api_key, deployment_name = _embedding_settings()
     api_url = f"{endpoint}/openai/deployments/{deployment_name}/embeddings?api-version=2023-05-15"
 
     headers = {
@@ -24,21 +62,148 @@ def generate_embedding(text):
         "api-key": api_key
     }
     payload = {
-        "input": text
+        "input": inputs
     }
 
-    response = requests.post(api_url, headers=headers, json=payload)
+    response = azure_openai_client.post(deployment_name, api_url, headers, payload)
     if response.status_code == 200:
-        return response.json()["data"][0]["embedding"]
+        response_data = response.json()
+        instrumentation.record_token_usage(deployment_name, response_data.get("usage"))
+        instrumentation.count("embedding_inputs_total", len(inputs) if isinstance(inputs, list) else 1,
+                              deployment=deployment_name)
+        data = sorted(response_data["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
     else:
         raise Exception(f"Failed to generate embedding. Error: {response.status_code} - {response.text}")
 
 
+def generate_embedding(text):
+    """
+    Generate an embedding for the given text using Azure OpenAI (text-embedding-3-small-march21).
+    Results are cached by normalized-text hash, so unchanged resumes are not re-embedded.
+    """
+    _, _, deployment_name = _embedding_settings()
+    cache = get_embedding_cache()
+    key = cache_key(text, deployment_name)
+
+    embedding = cache.get(key)
+    instrumentation.count("embedding_cache_total", result="hit" if embedding is not None else "miss")
+    if embedding is None:
+        embedding = _request_embeddings(text)[0]
+        cache.put(key, embedding)
+    return embedding
+
+
+def _count_tokens(text):
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    # Without tiktoken, over-estimate so packed requests stay under the limit.
+    return len(text) // 3 + 1
+
+
+def _split_text(text, max_tokens):
+    """
+    Split text into pieces of at most max_tokens tokens each.
+    """
+    if _ENCODING is not None:
+        tokens = _ENCODING.encode(text)
+        return [_ENCODING.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+    step = max_tokens * 3
+    return [text[i:i + step] for i in range(0, len(text), step)]
+
+
+def generate_embeddings(texts):
+    """
+    Generate embeddings for many texts with as few requests as the deployment limits allow.
+    Inputs longer than the per-input token limit are split and their piece embeddings are
+    combined with a token-weighted average. Vectors are returned in input order.
+    Cached texts are served from the embedding cache and duplicates are embedded once.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    _, _, deployment_name = _embedding_settings()
+    cache = get_embedding_cache()
+
+    keys = [cache_key(text, deployment_name) for text in texts]
+    found = {}
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key in found or key in missing:
+            continue
+        embedding = cache.get(key)
+        if embedding is None:
+            missing[key] = text
+        else:
+            found[key] = embedding
+
+    instrumentation.count("embedding_cache_total", len(found), result="hit")
+    instrumentation.count("embedding_cache_total", len(missing), result="miss")
+    if missing:
+        for key, embedding in zip(missing, _embed_batched(list(missing.values()))):
+            cache.put(key, embedding)
+            found[key] = embedding
+
+    return [found[key] for key in keys]
+
+
+def _embed_batched(texts):
+    """
+    Embed texts without consulting the cache, packing them into as few requests as possible.
+    """
+
+    max_inputs = int(os.environ.get("AZURE_OPENAI_EMBEDDING_MAX_INPUTS", DEFAULT_EMBEDDING_MAX_INPUTS))
+    max_input_tokens = int(os.environ.get("AZURE_OPENAI_EMBEDDING_MAX_INPUT_TOKENS", DEFAULT_EMBEDDING_MAX_INPUT_TOKENS))
+    max_request_tokens = int(os.environ.get("AZURE_OPENAI_EMBEDDING_MAX_REQUEST_TOKENS", DEFAULT_EMBEDDING_MAX_REQUEST_TOKENS))
+
+    # 1) Split oversized texts into pieces that fit a single input
+    pieces = []  # (text index, piece text, token count)
+    for i, text in enumerate(texts):
+        tokens = _count_tokens(text)
+        if tokens <= max_input_tokens:
+            pieces.append((i, text, tokens))
+        else:
+            for piece in _split_text(text, max_input_tokens):
+                pieces.append((i, piece, _count_tokens(piece)))
+
+    # 2) Pack pieces into requests bounded by input count and total tokens
+    batches = []
+    batch, batch_tokens = [], 0
+    for piece in pieces:
+        if batch and (len(batch) >= max_inputs or batch_tokens + piece[2] > max_request_tokens):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(piece)
+        batch_tokens += piece[2]
+    if batch:
+        batches.append(batch)
+
+    piece_vectors = []
+    for batch in batches:
+        piece_vectors.extend(_request_embeddings([piece[1] for piece in batch]))
+
+    # 3) Reassemble one vector per input text
+    grouped = {}
+    for (i, _, tokens), vector in zip(pieces, piece_vectors):
+        grouped.setdefault(i, []).append((vector, max(tokens, 1)))
+
+    embeddings = []
+    for i in range(len(texts)):
+        parts = grouped[i]
+        if len(parts) == 1:
+            embeddings.append(parts[0][0])
+            continue
+        combined = np.average([v for v, _ in parts], axis=0, weights=[w for _, w in parts])
+        norm = np.linalg.norm(combined)
+        embeddings.append((combined / norm if norm else combined).tolist())
+    return embeddings
+
+
 def store_embedding(email, embedding, resume_url):
     """
     Store the embedding in Azure Blob Storage as a JSON file.
     """
-    blob_storage = AzureBlobStorage()
+    blob_storage = get_blob_storage()
     container_name = "embeddings"
 
     # Build the JSON data for storing
@@ -58,22 +223,384 @@ def store_embedding(email, embedding, resume_url):
     except Exception as e:
         raise Exception(f"Failed to store embedding in Blob Storage: {e}")
 
+    # Keep the local ANN index current, if one is configured
+    ann_index_dir = os.environ.get("EMBEDDING_ANN_INDEX_DIR")
+    if ann_index_dir and os.path.exists(os.path.join(ann_index_dir, PARAMS_FILE)):
+        with instrumentation.span("ann_append"):
+            IVFIndex.append(ann_index_dir, embedding, {"id": file_name, "email": email, "resume_url": resume_url})
+
+
+def _is_embedding_blob(name):
+    return name.endswith("_embedding.json") or "_embedding_" in name
+
+
+def _embedding_blob_candidate(name):
+    """
+    Candidate part of an embedding blob name (the sanitized email).
+    """
+    return name[:name.index("_embedding")]
+
+
+def _embedding_blob_version(name):
+    """
+    Sortable version of an embedding blob: its YYYYmmdd_HHMMSS timestamp, or "" for
+    untimestamped blobs.
+    """
+    match = re.search(r"_embedding_(\d{8}_\d{6})\.json$", name)
+    return match.group(1) if match else ""
+
+
+def latest_embeddings(embeddings):
+    """
+    Reduce embedding records (with blob names as "id") to the newest one per candidate.
+    """
+    latest = {}
+    for item in embeddings:
+        candidate = _embedding_blob_candidate(item["id"])
+        current = latest.get(candidate)
+        if current is None or _embedding_blob_version(item["id"]) > _embedding_blob_version(current["id"]):
+            latest[candidate] = item
+    return list(latest.values())
+
 
-def download_all_embeddings():
+def download_all_embeddings(sync_dir=None, latest_only=False):
     """
     Download all embedding JSON files from Azure Blob Storage.
+    If sync_dir is given, only new or changed blobs are fetched (see sync_embeddings) and
+    the embeddings are read from that local store.
+    With latest_only, only the newest embedding per candidate is returned (see
+    download_latest_embeddings).
     """
-    blob_storage = AzureBlobStorage()
+    if sync_dir:
+        sync_embeddings(sync_dir)
+        embeddings = load_synced_embeddings(sync_dir)
+        return latest_embeddings(embeddings) if latest_only else embeddings
+
+    if latest_only:
+        return download_latest_embeddings()
+
+    blob_storage = get_blob_storage()
     container_name = "embeddings"
 
     container_client = blob_storage.blob_service_client.get_container_client(container_name)
+    blob_names = [blob.name for blob in container_client.list_blobs() if _is_embedding_blob(blob.name)]
+
     embeddings = []
+    for blob_name, content in zip(blob_names, blob_storage.download_blobs(container_name, blob_names)):
+        embedding_data = json.loads(content)
+        embedding_data.setdefault("id", blob_name)
+        embeddings.append(embedding_data)
+
+    return embeddings
+
+
+def _synced_blob_path(sync_dir, blob_name):
+    return os.path.join(sync_dir, SYNC_BLOBS_DIR, quote(blob_name, safe=""))
+
+
+def _read_manifest(sync_dir):
+    manifest_path = os.path.join(sync_dir, SYNC_MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(sync_dir, manifest):
+    manifest_path = os.path.join(sync_dir, SYNC_MANIFEST_FILE)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+def sync_embeddings(sync_dir):
+    """
+    Delta-sync the embeddings container into sync_dir.
+    A manifest of blob name, etag and last-modified is kept next to the local copies; only
+    blobs that are new or whose etag changed are downloaded, and blobs that no longer exist
+    in the container are removed locally. Returns counts of what changed.
+    """
+    os.makedirs(os.path.join(sync_dir, SYNC_BLOBS_DIR), exist_ok=True)
+    manifest = _read_manifest(sync_dir)
+
+    blob_storage = get_blob_storage()
+    container_name = "embeddings"
+    container_client = blob_storage.blob_service_client.get_container_client(container_name)
+
+    stats = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    seen = set()
+    changed = []
 
     for blob in container_client.list_blobs():
-        if blob.name.endswith("_embedding.json") or "_embedding_" in blob.name:
-            blob_client = container_client.get_blob_client(blob.name)
-            embedding_data = json.loads(blob_client.download_blob().readall())
-            embeddings.append(embedding_data)
+        if not _is_embedding_blob(blob.name):
+            continue
+        seen.add(blob.name)
 
+        entry = manifest.get(blob.name)
+        if entry and entry["etag"] == blob.etag:
+            stats["unchanged"] += 1
+        else:
+            changed.append(blob)
+            stats["updated" if entry else "added"] += 1
+
+    contents = blob_storage.download_blobs(container_name, [blob.name for blob in changed])
+    for blob, content in zip(changed, contents):
+        local_path = _synced_blob_path(sync_dir, blob.name)
+        with open(local_path + ".tmp", "wb") as f:
+            f.write(content)
+        os.replace(local_path + ".tmp", local_path)
+
+        manifest[blob.name] = {
+            "etag": blob.etag,
+            "last_modified": blob.last_modified.isoformat() if blob.last_modified else None
+        }
+
+    for blob_name in [name for name in manifest if name not in seen]:
+        local_path = _synced_blob_path(sync_dir, blob_name)
+        if os.path.exists(local_path):
+            os.remove(local_path)
+        del manifest[blob_name]
+        stats["deleted"] += 1
+
+    _write_manifest(sync_dir, manifest)
+    print(f"Embeddings synced to {sync_dir}: {stats}")
+    return stats
+
+
+def load_synced_embeddings(sync_dir):
+    """
+    Read the embeddings held in a local store written by sync_embeddings().
+    """
+    embeddings = []
+    for blob_name in sorted(_read_manifest(sync_dir)):
+        with open(_synced_blob_path(sync_dir, blob_name), "rb") as f:
+            embedding_data = json.loads(f.read())
+        embedding_data.setdefault("id", blob_name)
+        embeddings.append(embedding_data)
     return embeddings
 
+
+def build_vector_index(index_dir=None, sync_dir=None, shard_name=None, latest_only=True):
+    """
+    Download all embeddings once and write them to a local memory-mapped VectorIndex.
+    With sync_dir set, only blobs changed since the last sync are downloaded; with
+    shard_name set, the index is loaded from binary shards instead of JSON blobs.
+    By default only the newest embedding per candidate is indexed.
+    """
+    index_dir = index_dir or os.environ.get("EMBEDDING_INDEX_DIR", "vector_index")
+    sync_dir = sync_dir or os.environ.get("EMBEDDING_SYNC_DIR")
+    if shard_name:
+        index = VectorIndex.from_vectors(*read_embedding_shards(shard_name))
+    else:
+        index = VectorIndex.build(download_all_embeddings(sync_dir=sync_dir, latest_only=latest_only))
+    index.save(index_dir)
+    print(f"Vector index built with {len(index)} embeddings: {index_dir}")
+    return index
+
+
+def load_vector_index(index_dir=None):
+    """
+    Load the local VectorIndex, building it from Blob Storage if it does not exist yet.
+    """
+    index_dir = index_dir or os.environ.get("EMBEDDING_INDEX_DIR", "vector_index")
+    try:
+        return VectorIndex.load(index_dir)
+    except FileNotFoundError:
+        return build_vector_index(index_dir)
+
+
+def encode_embedding_shard(embeddings, dtype="float16"):
+    """
+    Pack embedding dicts into one binary shard.
+    float16 stores each value in 2 bytes; int8 stores 1 byte per value plus a float32
+    scale per row (symmetric scalar quantization, value = q * scale).
+    """
+    if dtype not in SHARD_DTYPES:
+        raise ValueError(f"Unsupported shard dtype {dtype}; expected one of {sorted(SHARD_DTYPES)}.")
+
+    records = [
+        {
+            "id": item.get("id") or item.get("email", ""),
+            "email": item.get("email", ""),
+            "resume_url": item.get("resume_url", "")
+        }
+        for item in embeddings
+    ]
+    vectors = np.asarray([item["embedding"] for item in embeddings], dtype=np.float32)
+    count = len(records)
+    dim = vectors.shape[1] if count else 0
+
+    metadata = json.dumps(records).encode("utf-8")
+    # Pad the sidecar so the numeric payload starts 8-byte aligned
+    metadata += b" " * (-(SHARD_HEADER.size + len(metadata)) % 8)
+    parts = [SHARD_HEADER.pack(SHARD_MAGIC, SHARD_VERSION, SHARD_DTYPES[dtype], count, dim, len(metadata)), metadata]
+
+    if dtype == "float16":
+        parts.append(vectors.astype("<f2").tobytes())
+    else:
+        scales = np.abs(vectors).max(axis=1) / 127 if count else np.zeros(0, dtype=np.float32)
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        parts.append(scales.astype("<f4").tobytes())
+        parts.append(quantized.tobytes())
+    return b"".join(parts)
+
+
+def decode_embedding_shard(data):
+    """
+    Unpack a binary shard into a (count, dim) float32 matrix and its list of records.
+    """
+    magic, version, dtype_code, count, dim, metadata_length = SHARD_HEADER.unpack_from(data, 0)
+    if magic != SHARD_MAGIC or version != SHARD_VERSION:
+        raise ValueError("Not a supported embedding shard.")
+
+    offset = SHARD_HEADER.size
+    records = json.loads(bytes(data[offset:offset + metadata_length]))
+    offset += metadata_length
+
+    if dtype_code == SHARD_DTYPES["float16"]:
+        vectors = np.frombuffer(data, dtype="<f2", count=count * dim, offset=offset)
+        vectors = vectors.reshape(count, dim).astype(np.float32)
+    elif dtype_code == SHARD_DTYPES["int8"]:
+        scales = np.frombuffer(data, dtype="<f4", count=count, offset=offset)
+        quantized = np.frombuffer(data, dtype=np.int8, count=count * dim, offset=offset + 4 * count)
+        vectors = quantized.reshape(count, dim).astype(np.float32) * scales[:, None]
+    else:
+        raise ValueError(f"Unknown shard dtype code {dtype_code}.")
+    return vectors, records
+
+
+def write_embedding_shards(embeddings, name="embeddings", dtype="float16", shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Write embeddings to the embeddings container as numbered binary shards under
+    shards/<name>-NNNNN.jceb, uploading concurrently. Returns the blob names written.
+    """
+    blob_storage = get_blob_storage()
+    container_name = "embeddings"
+
+    files = []
+    for shard_number, start in enumerate(range(0, len(embeddings), shard_size)):
+        file_name = f"{SHARD_PREFIX}{name}-{shard_number:05d}.jceb"
+        files.append((file_name, encode_embedding_shard(embeddings[start:start + shard_size], dtype)))
+
+    blob_storage.upload_blobs(container_name, files)
+    return [file_name for file_name, _ in files]
+
+
+def read_embedding_shards(name="embeddings"):
+    """
+    Download every shard written by write_embedding_shards(name) and return a single
+    float32 matrix with its records.
+    """
+    blob_storage = get_blob_storage()
+    container_name = "embeddings"
+    container_client = blob_storage.blob_service_client.get_container_client(container_name)
+
+    blob_names = sorted(
+        blob.name for blob in container_client.list_blobs(name_starts_with=f"{SHARD_PREFIX}{name}-")
+        if blob.name.endswith(".jceb")
+    )
+    matrices, records = [], []
+    for content in blob_storage.download_blobs(container_name, blob_names):
+        vectors, shard_records = decode_embedding_shard(content)
+        if len(shard_records):
+            matrices.append(vectors)
+            records.extend(shard_records)
+
+    if not matrices:
+        return np.zeros((0, 0), dtype=np.float32), []
+    return np.concatenate(matrices), records
+
+
+def read_embedding_snapshot():
+    """
+    Read the consolidated snapshot written by compact_embeddings() in one request.
+    Returns embedding dicts whose "embedding" is a float32 array; [] if there is no snapshot.
+    """
+    blob_storage = get_blob_storage()
+    blob_client = blob_storage.blob_service_client.get_blob_client("embeddings", SNAPSHOT_BLOB)
+    try:
+        content = blob_client.download_blob().readall()
+    except ResourceNotFoundError:
+        return []
+
+    vectors, records = decode_embedding_shard(content)
+    return [dict(record, embedding=vector) for record, vector in zip(records, vectors)]
+
+
+def download_latest_embeddings():
+    """
+    Return one embedding per candidate: the compaction snapshot plus only those embedding
+    blobs written after it, reduced to the newest version per candidate. Superseded
+    versions are never downloaded.
+    """
+    return _download_latest_embeddings()[0]
+
+
+def _download_latest_embeddings():
+    """
+    download_latest_embeddings(), also returning the embedding blob names seen in the
+    listing that the newest versions were chosen from.
+    """
+    blob_storage = get_blob_storage()
+    container_name = "embeddings"
+    container_client = blob_storage.blob_service_client.get_container_client(container_name)
+
+    latest = {item["id"]: item for item in latest_embeddings(read_embedding_snapshot())}
+    newest_names = {_embedding_blob_candidate(name): name for name in latest}
+
+    listed_names = [blob.name for blob in container_client.list_blobs() if _is_embedding_blob(blob.name)]
+    for name in listed_names:
+        candidate = _embedding_blob_candidate(name)
+        current = newest_names.get(candidate)
+        if current is None or _embedding_blob_version(name) > _embedding_blob_version(current):
+            newest_names[candidate] = name
+
+    to_download = [name for name in newest_names.values() if name not in latest]
+    for blob_name, content in zip(to_download, blob_storage.download_blobs(container_name, to_download)):
+        embedding_data = json.loads(content)
+        embedding_data.setdefault("id", blob_name)
+        latest[blob_name] = embedding_data
+
+    return [latest[name] for name in newest_names.values()], listed_names
+
+
+def compact_embeddings(superseded="keep", dtype="float16"):
+    """
+    Collapse timestamped embedding versions to one record per candidate.
+    Writes a consolidated snapshot of the newest embeddings that readers load in a single
+    request, then handles older versions according to `superseded`: "keep" leaves them,
+    "archive" moves them to the embeddings-archive container and "delete" removes them.
+    Returns counts of candidates and superseded blobs.
+    """
+    if superseded not in ("keep", "archive", "delete"):
+        raise ValueError("superseded must be one of 'keep', 'archive' or 'delete'.")
+
+    blob_storage = get_blob_storage()
+    container_name = "embeddings"
+
+    # 1) Newest embedding per candidate, then one snapshot blob holding all of them
+    embeddings, listed_names = _download_latest_embeddings()
+    blob_storage.upload_resume(container_name, SNAPSHOT_BLOB, encode_embedding_shard(embeddings, dtype))
+
+    # 2) Superseded versions come from the same listing the newest versions were picked
+    # from; blobs written since are never touched, and a blob only counts as superseded
+    # if its candidate has a strictly newer version in the snapshot.
+    newest_versions = {
+        _embedding_blob_candidate(item["id"]): _embedding_blob_version(item["id"]) for item in embeddings
+    }
+    old_names = [
+        name for name in listed_names
+        if _embedding_blob_candidate(name) in newest_versions
+        and _embedding_blob_version(name) < newest_versions[_embedding_blob_candidate(name)]
+    ]
+
+    if superseded == "archive" and old_names:
+        contents = blob_storage.download_blobs(container_name, old_names)
+        blob_storage.upload_blobs(ARCHIVE_CONTAINER, list(zip(old_names, contents)))
+    if superseded in ("archive", "delete") and old_names:
+        blob_storage.delete_blobs(container_name, old_names)
+
+    stats = {"candidates": len(embeddings), "superseded": len(old_names), "superseded_action": superseded}
+    print(f"Embeddings compacted into {container_name}/{SNAPSHOT_BLOB}: {stats}")
+    return stats
@@ -0,0 +1,110 @@
+import argparse
+import sys
+import numpy as np
+from ann_index import IVFIndex, recall_report, DEFAULT_NPROBE, REMOVED
+from vector_index import VectorIndex
+from embedding_service import compact_embeddings, download_all_embeddings, write_embedding_shards, DEFAULT_SHARD_SIZE
+
+
+def migrate(args):
+    """
+    Convert the JSON embedding blobs into binary shards.
+    """
+    embeddings = download_all_embeddings(sync_dir=args.sync_dir)
+    if not embeddings:
+        print("No JSON embeddings found; nothing to migrate.")
+        return
+
+    shard_names = write_embedding_shards(embeddings, name=args.name, dtype=args.dtype, shard_size=args.shard_size)
+    print(f"Migrated {len(embeddings)} embeddings into {len(shard_names)} {args.dtype} shard(s):")
+    for shard_name in shard_names:
+        print(f"  embeddings/{shard_name}")
+
+
+def compact(args):
+    """
+    Keep the newest embedding per candidate and write the consolidated snapshot.
+    """
+    superseded = "archive" if args.archive else "delete" if args.delete else "keep"
+    compact_embeddings(superseded=superseded, dtype=args.dtype)
+
+
+def ann_build(args):
+    """
+    Build the IVF ANN index from the newest embedding per candidate.
+    """
+    embeddings = download_all_embeddings(sync_dir=args.sync_dir, latest_only=True)
+    if not embeddings:
+        print("No embeddings found; nothing to index.")
+        return
+
+    index = IVFIndex.build(
+        [item["embedding"] for item in embeddings],
+        [{"id": item.get("id", ""), "email": item.get("email", ""), "resume_url": item.get("resume_url", "")} for item in embeddings],
+        nlist=args.nlist,
+        nprobe=args.nprobe
+    )
+    index.save(args.index_dir)
+    print(f"ANN index built with {len(index)} embeddings in {index.nlist} lists: {args.index_dir}")
+
+
+def ann_report(args):
+    """
+    Print recall@k and latency of the ANN index against exact search for several nprobe values.
+    """
+    index = IVFIndex.load(args.index_dir)
+    # Rows replaced by a newer embedding of the same candidate are not searchable
+    live = np.flatnonzero(index.assignments != REMOVED)
+    exact = VectorIndex.from_vectors(index.vectors[live], [index.records[i] for i in live])
+
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(live, min(args.queries, len(live)), replace=False)
+    # Perturb stored vectors so queries are near, but not identical to, indexed rows
+    queries = index.vectors[sample] + rng.normal(0, args.noise, (len(sample), index.vectors.shape[1])).astype(np.float32)
+
+    print(f"{'nprobe':>6} {'k':>4} {'recall':>7} {'mean ms':>8} {'p95 ms':>8} {'exact ms':>9}")
+    for row in recall_report(index, exact, queries, k_values=args.k, nprobes=args.nprobe):
+        print(f"{row['nprobe']:>6} {row['k']:>4} {row['recall']:>7.3f} {row['mean_ms']:>8.3f} "
+              f"{row['p95_ms']:>8.3f} {row['exact_mean_ms']:>9.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintenance commands for the embeddings container.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Convert JSON embedding blobs to binary shards.")
+    migrate_parser.add_argument("--name", default="embeddings", help="Shard set name (default: embeddings).")
+    migrate_parser.add_argument("--dtype", choices=["float16", "int8"], default="float16")
+    migrate_parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="Embeddings per shard.")
+    migrate_parser.add_argument("--sync-dir", help="Read JSON blobs through a local delta-sync store.")
+    migrate_parser.set_defaults(func=migrate)
+
+    compact_parser = subparsers.add_parser("compact", help="Collapse embedding versions to the newest per candidate.")
+    compact_parser.add_argument("--dtype", choices=["float16", "int8"], default="float16", help="Snapshot row format.")
+    superseded_group = compact_parser.add_mutually_exclusive_group()
+    superseded_group.add_argument("--archive", action="store_true", help="Move superseded versions to embeddings-archive.")
+    superseded_group.add_argument("--delete", action="store_true", help="Delete superseded versions.")
+    compact_parser.set_defaults(func=compact)
+
+    ann_build_parser = subparsers.add_parser("ann-build", help="Build the approximate nearest-neighbour index.")
+    ann_build_parser.add_argument("--index-dir", default="ann_index", help="Output directory (default: ann_index).")
+    ann_build_parser.add_argument("--nlist", type=int, help="Number of inverted lists (default: 4 * sqrt(n)).")
+    ann_build_parser.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE, help="Default lists probed per query.")
+    ann_build_parser.add_argument("--sync-dir", help="Read JSON blobs through a local delta-sync store.")
+    ann_build_parser.set_defaults(func=ann_build)
+
+    ann_report_parser = subparsers.add_parser("ann-report", help="Report ANN recall@k and latency against exact search.")
+    ann_report_parser.add_argument("--index-dir", default="ann_index")
+    ann_report_parser.add_argument("--queries", type=int, default=200, help="Number of sampled queries.")
+    ann_report_parser.add_argument("--noise", type=float, default=0.01, help="Std-dev of noise added to sampled queries.")
+    ann_report_parser.add_argument("--k", type=int, nargs="+", default=[1, 10])
+    ann_report_parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    ann_report_parser.add_argument("--seed", type=int, default=0)
+    ann_report_parser.set_defaults(func=ann_report)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import base64
+import binascii
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from embedding_service import build_vector_index, generate_embedding, load_vector_index
+from search_service import search_candidates
+
+RRF_K = 60
+DEFAULT_CANDIDATES_PER_LEG = 50
+# How often the vector leg's index is rebuilt so newly stored resumes become searchable
+DEFAULT_INDEX_REFRESH_SECONDS = 300
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search")
+_index = None
+_index_refreshed_at = 0.0
+_index_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+
+def refresh_index(sync_dir=None):
+    """
+    Rebuild the vector leg's index from the embeddings container and start using it.
+    With EMBEDDING_SYNC_DIR (or sync_dir) set, only embeddings changed since the last
+    sync are downloaded.
+    """
+    global _index, _index_refreshed_at
+    index = build_vector_index(sync_dir=sync_dir)
+    with _index_lock:
+        _index = index
+        _index_refreshed_at = time.monotonic()
+    return index
+
+
+def _refresh_in_background():
+    try:
+        refresh_index()
+    except Exception as e:
+        print(f"Failed to refresh the vector index: {e}")
+    finally:
+        _refresh_lock.release()
+
+
+def _get_index():
+    """
+    The shared index, loaded on first use. Once it is older than
+    HYBRID_INDEX_REFRESH_SECONDS (0 disables) a rebuild starts in the background and
+    queries keep using the current index until it is ready.
+    """
+    global _index, _index_refreshed_at
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_vector_index()
+                _index_refreshed_at = time.monotonic()
+        return _index
+
+    refresh_seconds = float(os.environ.get("HYBRID_INDEX_REFRESH_SECONDS", DEFAULT_INDEX_REFRESH_SECONDS))
+    if refresh_seconds and time.monotonic() - _index_refreshed_at > refresh_seconds:
+        if _refresh_lock.acquire(blocking=False):
+            # Push the next attempt out a full interval even if this rebuild fails
+            _index_refreshed_at = time.monotonic()
+            threading.Thread(target=_refresh_in_background, daemon=True, name="hybrid-index-refresh").start()
+    return _index
+
+
+def _decode_storage_path(doc_id):
+    """
+    Decode a blob indexer document key back to the blob URL, or return None.
+    The indexer's URL-token encoding strips '=' padding and appends the pad count.
+    """
+    candidates = [doc_id]
+    if doc_id[-1:].isdigit():
+        candidates.insert(0, doc_id[:-1] + "=" * int(doc_id[-1]))
+    for candidate in candidates:
+        try:
+            decoded = base64.urlsafe_b64decode(candidate + "=" * (-len(candidate) % 4)).decode("utf-8")
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            continue
+        if decoded.startswith("http"):
+            return decoded
+    return None
+
+
+def _search_document_key(doc):
+    """
+    Key a search document by its resume blob URL so it fuses with the vector hit for the
+    same resume; fall back to the document id.
+    """
+    if doc.get("resume_url"):
+        return doc["resume_url"]
+    doc_id = doc.get("id", "")
+    return _decode_storage_path(doc_id) or doc_id
+
+
+def _vector_hit_key(hit):
+    return hit.get("resume_url") or hit.get("email") or hit.get("id")
+
+
+def reciprocal_rank_fusion(ranked_lists, k=RRF_K):
+    """
+    Merge ranked lists of keys with reciprocal-rank fusion: each key scores the sum of
+    1 / (k + rank) over the lists it appears in. Returns (key, score) pairs, best first.
+    """
+    scores = {}
+    for ranked in ranked_lists:
+        for rank, key in enumerate(ranked, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def hybrid_search(query_text, top_k=10, index=None, candidates_per_leg=DEFAULT_CANDIDATES_PER_LEG):
+    """
+    Run local vector kNN over stored resume embeddings and Azure semantic search in
+    parallel, then fuse both rankings with reciprocal-rank fusion.
+    The query is embedded once (and cached by generate_embedding); total latency is that
+    of the slower leg. Returns up to top_k merged results, best first.
+    """
+    # An empty index is falsy, so only fall back to the shared one when none was passed
+    if index is None:
+        index = _get_index()
+
+    def vector_leg():
+        return index.search(generate_embedding(query_text), top_k=candidates_per_leg)
+
+    def text_leg():
+        return search_candidates(query_text=query_text, top_k=candidates_per_leg)["documents"]
+
+    vector_future = _executor.submit(vector_leg)
+    text_future = _executor.submit(text_leg)
+    vector_hits = vector_future.result()
+    text_docs = text_future.result()
+
+    merged = {}
+    vector_keys = []
+    for hit in vector_hits:
+        key = _vector_hit_key(hit)
+        # Older embedding versions of the same resume only count once, at their best rank
+        if key in merged:
+            continue
+        vector_keys.append(key)
+        rank = len(vector_keys)
+        merged.setdefault(key, {}).update({
+            "email": hit.get("email", ""),
+            "resume_url": hit.get("resume_url", ""),
+            "vector_score": hit["score"],
+            "vector_rank": rank
+        })
+
+    text_keys = []
+    for doc in text_docs:
+        key = _search_document_key(doc)
+        if key in text_keys:
+            continue
+        text_keys.append(key)
+        rank = len(text_keys)
+        merged.setdefault(key, {}).update({
+            "id": doc.get("id", ""),
+            "content": doc.get("content", ""),
+            "caption": doc.get("caption", ""),
+            "reranker_score": doc.get("reranker_score", 0),
+            "search_rank": rank
+        })
+
+    results = []
+    for key, score in reciprocal_rank_fusion([vector_keys, text_keys])[:top_k]:
+        results.append(dict(merged[key], key=key, score=score))
+    return results
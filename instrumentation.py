@@ -0,0 +1,272 @@
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Metrics are off unless METRICS_ENABLED is set; every call below is then a single flag check.
+METRICS_PREFIX = "jobcoach_"
+DEFAULT_EXPORT = "prometheus"
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+logger = logging.getLogger("jobcoach.metrics")
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+_enabled = _env_flag("METRICS_ENABLED")
+_log_spans = "log" in os.environ.get("METRICS_EXPORT", DEFAULT_EXPORT).split(",")
+
+
+def enabled():
+    return _enabled
+
+
+def configure(enable=True, log_spans=None):
+    """
+    Turn collection on or off at runtime (e.g. from a CLI flag) instead of through the
+    environment. log_spans additionally writes one JSON log line per finished span.
+    """
+    global _enabled, _log_spans
+    _enabled = enable
+    if log_spans is not None:
+        _log_spans = log_spans
+    if _enabled and _log_spans and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+
+class Registry:
+    """
+    Thread-safe counters and duration histograms keyed on metric name and labels.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}  # key -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def increment(self, name, value, labels):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, labels):
+        key = (name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(DURATION_BUCKETS) + 1) + [0.0]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += 1
+            histogram[-1] += seconds
+
+    def clear(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+_registry = Registry()
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, key, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    Times a block of work. On exit the duration is recorded in the <name>_seconds
+    histogram, failures in <name>_errors_total, and (with log export) one JSON line is
+    logged with the labels plus any attributes added through set().
+    """
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.attributes = {}
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        labels = _labels(self.labels)
+        # GeneratorExit and KeyboardInterrupt end a span early but are not failures
+        failed = exc_type is not None and issubclass(exc_type, Exception)
+        _registry.observe(f"{self.name}_seconds", seconds, labels)
+        if failed:
+            _registry.increment(f"{self.name}_errors_total", 1, labels)
+        if _log_spans:
+            logger.info(json.dumps({
+                "span": self.name,
+                "seconds": round(seconds, 6),
+                "error": exc_type.__name__ if failed else None,
+                **self.labels,
+                **self.attributes
+            }, default=str))
+        return False
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+
+def span(name, **labels):
+    """
+    Context manager timing one stage: `with span("blob_upload", container=name) as s:`.
+    Keep labels low-cardinality (stage, container, deployment); put per-call detail in
+    s.set(), which only reaches the logs.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, labels)
+
+
+def count(name, value=1, **labels):
+    """
+    Add value to the counter <name> (e.g. bytes transferred, retries, tokens).
+    """
+    if _enabled:
+        _registry.increment(name, value, _labels(labels))
+
+
+def observe(name, seconds, **labels):
+    """
+    Record a duration measured by the caller, e.g. time to the first streamed token.
+    """
+    if _enabled:
+        _registry.observe(f"{name}_seconds", seconds, _labels(labels))
+
+
+def record_token_usage(deployment_name, usage):
+    """
+    Count the prompt/completion tokens reported in an Azure OpenAI response's "usage".
+    """
+    if not _enabled or not usage:
+        return
+    labels = _labels({"deployment": deployment_name})
+    for field in ("prompt_tokens", "completion_tokens"):
+        if usage.get(field):
+            _registry.increment(f"openai_{field}_total", usage[field], labels)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def render_prometheus():
+    """
+    Current metrics in the Prometheus text exposition format.
+    """
+    with _registry._lock:
+        counters = sorted(_registry.counters.items())
+        histograms = sorted((key, list(values)) for key, values in _registry.histograms.items())
+
+    lines = []
+    typed = set()
+    for (name, labels), value in counters:
+        metric = METRICS_PREFIX + name
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} counter")
+            typed.add(metric)
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+    for (name, labels), values in histograms:
+        metric = METRICS_PREFIX + name
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} histogram")
+            typed.add(metric)
+        for bound, bucket_count in zip(DURATION_BUCKETS, values):
+            lines.append(f"{metric}_bucket{_format_labels(labels, [('le', str(bound))])} {bucket_count}")
+        lines.append(f"{metric}_bucket{_format_labels(labels, [('le', '+Inf')])} {values[-2]}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {values[-2]}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {values[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def summary():
+    """
+    Per-span count, total and mean seconds plus all counters, as plain dicts (for reports).
+    """
+    with _registry._lock:
+        spans = {}
+        for (name, labels), values in _registry.histograms.items():
+            key = name + _format_labels(labels)
+            spans[key] = {"count": values[-2], "total_seconds": values[-1],
+                          "mean_seconds": values[-1] / values[-2] if values[-2] else 0.0}
+        counters = {name + _format_labels(labels): value for (name, labels), value in _registry.counters.items()}
+    return {"spans": spans, "counters": counters}
+
+
+def reset():
+    _registry.clear()
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host="0.0.0.0"):
+    """
+    Serve render_prometheus() at /metrics on a daemon thread. Does nothing unless metrics
+    are enabled and a port is given or set in METRICS_PORT; safe to call on every rerun.
+    """
+    global _server
+    port = port or os.environ.get("METRICS_PORT")
+    if not _enabled or not port or _server is not None:
+        return _server
+    with _server_lock:
+        if _server is None:
+            class Handler(BaseHTTPRequestHandler):
+                def log_message(self, *args):
+                    pass
+
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = render_prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            server = ThreadingHTTPServer((host, int(port)), Handler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+            _server = server
+    return _server
+
+
+if _enabled:
+    configure(True)
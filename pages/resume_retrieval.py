@@ -1,5 +1,18 @@
+import os
 import streamlit as st
-from search_service import search_candidates
+from search_service import search_candidates_page
+
+PAGE_SIZE = 10
+
+# Only id and content are guaranteed to exist in the index, and Azure Search rejects a
+# select naming an unknown field. Extra fields to request and show, e.g. "roles,career",
+# are configured through RESUME_RETRIEVAL_EXTRA_FIELDS.
+DISPLAY_FIELDS = [
+    (field, field.replace("_", " ").title())
+    for field in (name.strip() for name in os.environ.get("RESUME_RETRIEVAL_EXTRA_FIELDS", "").split(","))
+    if field and field not in ("id", "content")
+]
+SELECT_FIELDS = ["id", "content"] + [field for field, _ in DISPLAY_FIELDS]
 
 st.title("Resume Retrieval")
 st.subheader("View resumes stored in the system")
@@ -8,69 +21,41 @@ st.subheader("View resumes stored in the system")
 query_text = st.text_input("Enter a query (e.g., 'Who makes a good engineer?'):")
 
 if st.button("Search"):
+    st.session_state.retrieval_query = query_text
+    st.session_state.retrieval_page = 0
+
+if "retrieval_query" in st.session_state:
+    page = st.session_state.get("retrieval_page", 0)
     try:
         with st.spinner("Searching..."):
-            # Retrieve data from your semantic search function
-            result_data = search_candidates(query_text=query_text, top_k=100)
-        
+            # Retrieve only the page being viewed
+            result_data = search_candidates_page(
+                query_text=st.session_state.retrieval_query,
+                page=page,
+                page_size=PAGE_SIZE,
+                select=SELECT_FIELDS
+            )
+
         # Documents (our actual records)
         documents = result_data.get("documents", [])
         if documents:
-            st.write("### Resumes")
+            total_count = result_data.get("total_count")
+            st.write(f"### Resumes (page {page + 1}" + (f", {total_count} total)" if total_count is not None else ")"))
             for doc in documents:
-                st.write(f"**ID**: {doc.get('id', 'Unknown')}")
-                st.write(f"**Score**: {doc.get('reranker_score', 0)}")
-                
                 # Safely handle strings for content
-                content_text = doc.get('content', 'No content available')
-                st.write(f"**Resume Content**: {content_text[:500]}...")  # Slice up to 500 chars
-                
-                # Display additional fields from your index (all are strings by default)
-                roles = doc.get('roles', '')
-                if roles:
-                    st.write(f"**Roles**: {roles}")
-                
-                role_category = doc.get('role_category', '')
-                if role_category:
-                    st.write(f"**Role Category**: {role_category}")
-                
-                career = doc.get('career', '')
-                if career:
-                    st.write(f"**Career**: {career}")
-                
-                contact = doc.get('contact', '')
-                if contact:
-                    st.write(f"**Contact**: {contact}")
-
-                personality = doc.get('personality', '')
-                if personality:
-                    st.write(f"**Personality**: {personality}")
-
-                name = doc.get('name', '')
-                if name:
-                    st.write(f"**Name**: {name}")
-
-                keywords = doc.get('keywords', '')
-                if keywords:
-                    st.write(f"**Keywords**: {keywords}")
-
-                # If you have chunk, title, text_vector, or resume_url, display them similarly:
-                chunk = doc.get('chunk', '')
-                if chunk:
-                    st.write(f"**Chunk**: {chunk}")
-                
-                title = doc.get('title', '')
-                if title:
-                    st.write(f"**Title**: {title}")
-                
-                resume_url = doc.get('resume_url', '')
-                if resume_url:
-                    st.write(f"**Resume URL**: {resume_url}")
-
-                text_vector = doc.get('text_vector', '')
-                if text_vector:
-                    st.write(f"**Text Vector**: {text_vector}")
+                content_text = doc.get('content') or 'No content available'
+                lines = [
+                    f"**ID**: {doc.get('id', 'Unknown')}",
+                    f"**Score**: {doc.get('reranker_score', 0)}",
+                    f"**Resume Content**: {content_text[:500]}..."  # Slice up to 500 chars
+                ]
+                for field, label in DISPLAY_FIELDS:
+                    value = doc.get(field, '')
+                    if value:
+                        lines.append(f"**{label}**: {value}")
 
+                # One markdown element per resume instead of one per field
+                st.markdown("  \n".join(lines))
                 st.write("---")
         else:
             st.info("No resumes found.")
@@ -83,5 +68,14 @@ if st.button("Search"):
                 highlights_or_text = ans.get('highlights') or ans.get('text') or ''
                 st.write(f"**Answer** (score={ans.get('score', 0)}): {highlights_or_text}")
 
+        # Page navigation
+        previous_col, next_col = st.columns(2)
+        if previous_col.button("Previous page", disabled=page == 0):
+            st.session_state.retrieval_page = page - 1
+            st.rerun()
+        if next_col.button("Next page", disabled=not result_data.get("has_more")):
+            st.session_state.retrieval_page = page + 1
+            st.rerun()
+
     except Exception as e:
-        st.error(f"Failed to load resumes: {e}")
\ No newline at end of file
+        st.error(f"Failed to load resumes: {e}")
@@ -0,0 +1,103 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import instrumentation
+from azure_blob_storage import get_blob_storage
+from embedding_service import generate_embedding, store_embedding
+from search_service import invalidate_search_cache
+
+DEFAULT_MAX_WORKERS = 8
+
+_executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="resume-pipeline")
+
+
+class PipelineRun:
+    """
+    Status of one background persistence run. Each stage moves from "pending" to
+    "running" and then to "succeeded", "failed" or "skipped" (an upstream stage failed).
+    """
+
+    def __init__(self, stage_names):
+        self.stages = {
+            name: {"status": "pending", "result": None, "error": None, "seconds": None}
+            for name in stage_names
+        }
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+
+    def _update(self, name, **fields):
+        with self._lock:
+            self.stages[name].update(fields)
+            if all(stage["status"] in ("succeeded", "failed", "skipped") for stage in self.stages.values()):
+                self._finished.set()
+
+    def done(self):
+        return self._finished.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until every stage has finished; returns False on timeout.
+        """
+        return self._finished.wait(timeout)
+
+    @property
+    def status(self):
+        if not self.done():
+            return "running"
+        if any(stage["status"] != "succeeded" for stage in self.stages.values()):
+            return "failed"
+        return "succeeded"
+
+
+def _run_stage(run, name, func, *args, **kwargs):
+    run._update(name, status="running")
+    start = time.perf_counter()
+    try:
+        with instrumentation.span("pipeline_stage", stage=name):
+            result = func(*args, **kwargs)
+    except Exception as e:
+        run._update(name, status="failed", error=str(e), seconds=time.perf_counter() - start)
+        raise
+    run._update(name, status="succeeded", result=result, seconds=time.perf_counter() - start)
+    return result
+
+
+def persist_resume(email, resume_text, executor=None):
+    """
+    Store a generated resume and index its embedding in the background.
+    Storing the resume text and generating the embedding run concurrently; the embedding
+    is stored once both have finished, so it can point at the stored resume.
+    Returns a PipelineRun immediately.
+    """
+    executor = executor or _executor
+    blob_storage = get_blob_storage()
+    run = PipelineRun(["store_resume", "generate_embedding", "store_embedding"])
+
+    def store_resume():
+        result = blob_storage.store_resume(email, resume_text)
+        invalidate_search_cache()
+        return result
+
+    store_future = executor.submit(_run_stage, run, "store_resume", store_resume)
+    embed_future = executor.submit(_run_stage, run, "generate_embedding", generate_embedding, resume_text)
+
+    pending = [2]
+    pending_lock = threading.Lock()
+
+    def on_upstream_done(_):
+        with pending_lock:
+            pending[0] -= 1
+            if pending[0]:
+                return
+
+        if store_future.exception() or embed_future.exception():
+            run._update("store_embedding", status="skipped", error="An upstream stage failed.")
+            return
+        executor.submit(
+            _run_stage, run, "store_embedding", store_embedding,
+            email=email, embedding=embed_future.result(), resume_url=blob_storage.resume_url(email)
+        )
+
+    store_future.add_done_callback(on_upstream_done)
+    embed_future.add_done_callback(on_upstream_done)
+    return run
@@ -1,12 +1,18 @@
 import os
-import requests
-from embedding_service import generate_embedding
-from search_service import search_candidates
+import json
+import time
+import azure_openai_client
+import instrumentation
+from transcript_condenser import condense_transcript
 
-def generate_resume(input_text, email="", phone=""):
+def _resume_request(input_text, email="", phone="", on_truncated=None):
     """
-    Generate a resume using Azure OpenAI (gpt-35-turbo).
+    Build the deployment name, URL, headers and payload for a resume chat completion.
+    Long transcripts are first condensed into a candidate brief (see transcript_condenser);
+    on_truncated is told if condensing failed and part of the transcript was dropped.
     """
+    input_text = condense_transcript(input_text, on_truncated=on_truncated)
+
     # Append additional information to the input text
     additional_info = f"""
     Candidate Contact Information:
@@ -56,14 +62,64 @@ def generate_resume(input_text, email="", phone=""):
     # Construct the full API URL
     api_url = f"{endpoint}openai/deployments/{deployment_name}/chat/completions?api-version=2025-01-01-preview"
 
-    response = requests.post(
-        api_url,
-        headers=headers,
-        json=payload
-    )
+    return deployment_name, api_url, headers, payload
+
+
+def generate_resume(input_text, email="", phone="", on_truncated=None):
+    """
+    Generate a resume using Azure OpenAI (gpt-35-turbo).
+    """
+    deployment_name, api_url, headers, payload = _resume_request(input_text, email, phone, on_truncated)
+    response = azure_openai_client.post(deployment_name, api_url, headers, payload)
 
     if response.status_code == 200:
         # Extract the generated resume
-        return response.json()["choices"][0]["message"]["content"]
+        response_data = response.json()
+        instrumentation.record_token_usage(deployment_name, response_data.get("usage"))
+        return response_data["choices"][0]["message"]["content"]
     else:
-        raise Exception(f"Failed to generate resume. Error: {response.status_code} - {response.text}")
\ No newline at end of file
+        raise Exception(f"Failed to generate resume. Error: {response.status_code} - {response.text}")
+
+
+def generate_resume_stream(input_text, email="", phone="", on_truncated=None):
+    """
+    Generate a resume like generate_resume, but yield content deltas as the model produces
+    them (chat completions `stream` option) so the UI can render progressively.
+    """
+    # Time to first token includes condensing a long transcript, as the user waits for both
+    start = time.perf_counter()
+    deployment_name, api_url, headers, payload = _resume_request(input_text, email, phone, on_truncated)
+    payload["stream"] = True
+    # Ask for a final usage chunk so streamed generations report token counts too
+    payload["stream_options"] = {"include_usage": True}
+    response = azure_openai_client.post(deployment_name, api_url, headers, payload, stream=True)
+
+    if response.status_code != 200:
+        raise Exception(f"Failed to generate resume. Error: {response.status_code} - {response.text}")
+
+    first_token = True
+    try:
+        with instrumentation.span("resume_stream", deployment=deployment_name):
+            # Server-sent events: one "data: {json}" line per chunk, terminated by "data: [DONE]".
+            # SSE is always UTF-8; without a charset requests would decode it as ISO-8859-1
+            response.encoding = "utf-8"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                instrumentation.record_token_usage(deployment_name, chunk.get("usage"))
+                # Azure sends chunks without choices (e.g. content filter results); skip those
+                if not chunk.get("choices"):
+                    continue
+                content = chunk["choices"][0].get("delta", {}).get("content")
+                if content:
+                    if first_token:
+                        instrumentation.observe("resume_first_token", time.perf_counter() - start,
+                                                deployment=deployment_name)
+                        first_token = False
+                    yield content
+    finally:
+        response.close()
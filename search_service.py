@@ -1,8 +1,130 @@
 import os
-from azure.search.documents import SearchClient
-from azure.core.credentials import AzureKeyCredential
+import threading
+import time
+from collections import OrderedDict
+import instrumentation
 
-def search_candidates(query_text=None, top_k=5):
+INDEX_NAME = "resumesearch"  # Replace with your index name
+DEFAULT_SEMANTIC_CONFIGURATION = "my-semantic-config"
+DEFAULT_CACHE_TTL_SECONDS = 60
+DEFAULT_CACHE_MAX_ENTRIES = 256
+DEFAULT_SELECT = ["id", "content"]
+DEFAULT_PAGE_SIZE = 10
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire ttl seconds after being stored.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_search_client = None
+_client_lock = threading.Lock()
+_result_cache = TTLCache(
+    ttl=float(os.environ.get("SEARCH_CACHE_TTL_SECONDS", DEFAULT_CACHE_TTL_SECONDS)),
+    max_entries=int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", DEFAULT_CACHE_MAX_ENTRIES))
+)
+
+
+def get_search_client():
+    """
+    Return the process-wide SearchClient, constructing it on first use.
+    """
+    global _search_client
+    if _search_client is None:
+        with _client_lock:
+            if _search_client is None:
+                endpoint = os.environ.get("AZURE_SEARCH_ENDPOINT")
+                api_key = os.environ.get("AZURE_SEARCH_API_KEY")
+
+                if not endpoint or not api_key:
+                    raise ValueError("Azure Cognitive Search environment variables are not set correctly.")
+
+                # Imported here so callers that only touch the result cache skip the SDK
+                from azure.search.documents import SearchClient
+                from azure.core.credentials import AzureKeyCredential
+                _search_client = SearchClient(endpoint=endpoint, index_name=INDEX_NAME, credential=AzureKeyCredential(api_key))
+    return _search_client
+
+
+def invalidate_search_cache():
+    """
+    Drop all cached search results, e.g. after a new resume has been stored.
+    """
+    _result_cache.clear()
+
+
+def _first_caption(result):
+    """
+    Retrieve the first semantic caption of a result safely.
+    """
+    captions = result.get("@search.captions", None)
+    first_caption = ""
+    if captions is not None:
+        if isinstance(captions, list):
+            if len(captions) > 0:
+                first_item = captions[0]
+                if isinstance(first_item, dict):
+                    first_caption = first_item.get("highlights", "") or first_item.get("text", "")
+                else:
+                    first_caption = getattr(first_item, "highlights", "") or getattr(first_item, "text", "")
+        else:
+            # captions is not a list; assume it's a single object
+            first_caption = getattr(captions, "highlights", "") or getattr(captions, "text", "")
+    return first_caption
+
+
+def _build_document(result, select):
+    document = {field: result.get(field, "") for field in select}
+    document["id"] = result.get("id", "Unknown")
+    if "content" in select:
+        document["content"] = result.get("content", "No content available")
+    document["reranker_score"] = result.get("@search.rerankerScore", result.get("@search.reranker_score", 0))
+    document["caption"] = _first_caption(result)
+    return document
+
+
+def _build_answers(semantic_answers):
+    return [
+        {
+            "text": ans.text,
+            "highlights": ans.highlights,
+            "score": ans.score
+        }
+        for ans in semantic_answers
+    ]
+
+
+def search_candidates(query_text=None, top_k=5, semantic_configuration_name=DEFAULT_SEMANTIC_CONFIGURATION, use_cache=True):
     """
     Perform a semantic search in Azure Cognitive Search, returning semantic captions and
     semantic answers if the query is question-like. The function demonstrates:
@@ -11,73 +133,128 @@ def search_candidates(query_text=None, top_k=5):
     3. returning captions (query_caption='extractive')
     4. returning semantic answers (query_answer='extractive')
     5. retrieving reranker scores, captions, answers, and standard fields
-    """
 
-    endpoint = os.environ.get("AZURE_SEARCH_ENDPOINT")
-    api_key = os.environ.get("AZURE_SEARCH_API_KEY")
-    index_name = "resumesearch"  # Replace with your index name
-
-    if not endpoint or not api_key:
-        raise ValueError("Azure Cognitive Search environment variables are not set correctly.")
+    Results are cached for a short TTL keyed on query, top_k and semantic configuration;
+    cached results are shared between callers and must not be modified.
+    """
 
-    # Instantiate SearchClient
-    client = SearchClient(endpoint=endpoint, index_name=index_name, credential=AzureKeyCredential(api_key))
+    # Reuse the process-wide SearchClient
+    client = get_search_client()
 
     # Use wildcard "*" if no query_text is provided
     final_query = query_text if query_text else "*"
 
+    cache_key = (final_query, top_k, semantic_configuration_name)
+    if use_cache:
+        cached = _result_cache.get(cache_key)
+        instrumentation.count("search_cache_total", result="hit" if cached is not None else "miss")
+        if cached is not None:
+            return cached
+
     try:
-        # Perform the semantic search
-        results = client.search(
-            search_text=final_query,
-            query_type="semantic",
-            semantic_configuration_name="my-semantic-config",
-            select=["id", "content"],
-            top=top_k,
-            query_caption="extractive",
-            query_answer="extractive"
-        )
-
-        # 1) Retrieve semantic answers from the response
-        semantic_answers = results.get_answers() or []
-
-        # 2) Build a list of documents, including the reranker score & captions
-        documents = []
-        for result in results:
-            # Retrieve the captions safely
-            captions = result.get("@search.captions", None)
-            first_caption = ""
-            if captions is not None:
-                if isinstance(captions, list):
-                    if len(captions) > 0:
-                        first_item = captions[0]
-                        if isinstance(first_item, dict):
-                            first_caption = first_item.get("highlights", "") or first_item.get("text", "")
-                        else:
-                            first_caption = getattr(first_item, "highlights", "") or getattr(first_item, "text", "")
-                else:
-                    # captions is not a list; assume it's a single object
-                    first_caption = getattr(captions, "highlights", "") or getattr(captions, "text", "")
-            
-            documents.append({
-                "id": result.get("id", "Unknown"),
-                "content": result.get("content", "No content available"),
-                "reranker_score": result.get("@search.rerankerScore", result.get("@search.reranker_score", 0)),
-                "caption": first_caption
-            })
+        with instrumentation.span("search", operation="search_candidates") as span:
+            # Perform the semantic search
+            results = client.search(
+                search_text=final_query,
+                query_type="semantic",
+                semantic_configuration_name=semantic_configuration_name,
+                select=DEFAULT_SELECT,
+                top=top_k,
+                query_caption="extractive",
+                query_answer="extractive"
+            )
+
+            # 1) Retrieve semantic answers from the response
+            semantic_answers = results.get_answers() or []
+
+            # 2) Build a list of documents, including the reranker score & captions
+            documents = [_build_document(result, DEFAULT_SELECT) for result in results]
+            span.set("documents", len(documents))
 
         # 3) Return a dictionary with "semantic_answers" and "documents"
-        return {
-            "semantic_answers": [
-                {
-                    "text": ans.text,
-                    "highlights": ans.highlights,
-                    "score": ans.score
-                }
-                for ans in semantic_answers
-            ],
+        result_data = {
+            "semantic_answers": _build_answers(semantic_answers),
             "documents": documents
         }
+        _result_cache.put(cache_key, result_data)
+        return result_data
 
     except Exception as e:
-        raise Exception(f"Failed to perform semantic search: {e}")
\ No newline at end of file
+        raise Exception(f"Failed to perform semantic search: {e}")
+
+
+def search_candidates_page(query_text=None, page=0, page_size=DEFAULT_PAGE_SIZE, select=None,
+                           semantic_configuration_name=DEFAULT_SEMANTIC_CONFIGURATION, use_cache=True):
+    """
+    Fetch a single page of semantic search results using top/skip, selecting only the
+    given fields. Semantic answers are requested on the first page only.
+    Note that Azure's semantic ranker reranks at most the first 50 matches, so pages past
+    that point are ordered by the plain text score.
+
+    Returns a dictionary with "semantic_answers", "documents", "page", "page_size",
+    "total_count" and "has_more".
+    """
+    client = get_search_client()
+    final_query = query_text if query_text else "*"
+    select = list(select or DEFAULT_SELECT)
+
+    cache_key = ("page", final_query, page, page_size, tuple(select), semantic_configuration_name)
+    if use_cache:
+        cached = _result_cache.get(cache_key)
+        instrumentation.count("search_cache_total", result="hit" if cached is not None else "miss")
+        if cached is not None:
+            return cached
+
+    try:
+        search_kwargs = {}
+        if page == 0:
+            search_kwargs["query_answer"] = "extractive"
+
+        with instrumentation.span("search", operation="search_candidates_page") as span:
+            results = client.search(
+                search_text=final_query,
+                query_type="semantic",
+                semantic_configuration_name=semantic_configuration_name,
+                select=select,
+                top=page_size,
+                skip=page * page_size,
+                include_total_count=True,
+                query_caption="extractive",
+                **search_kwargs
+            )
+
+            documents = [_build_document(result, select) for result in results]
+            total_count = results.get_count()
+            semantic_answers = (results.get_answers() or []) if page == 0 else []
+            span.set("documents", len(documents))
+
+        result_data = {
+            "semantic_answers": _build_answers(semantic_answers),
+            "documents": documents,
+            "page": page,
+            "page_size": page_size,
+            "total_count": total_count,
+            "has_more": len(documents) == page_size and (
+                total_count is None or (page + 1) * page_size < total_count
+            )
+        }
+        _result_cache.put(cache_key, result_data)
+        return result_data
+
+    except Exception as e:
+        raise Exception(f"Failed to perform semantic search: {e}")
+
+
+def iter_search_candidates(query_text=None, page_size=DEFAULT_PAGE_SIZE, select=None,
+                           semantic_configuration_name=DEFAULT_SEMANTIC_CONFIGURATION):
+    """
+    Lazily yield documents one page at a time; a page is only requested when the caller
+    iterates past the previous one.
+    """
+    page = 0
+    while True:
+        result_data = search_candidates_page(query_text, page, page_size, select, semantic_configuration_name)
+        yield from result_data["documents"]
+        if not result_data["has_more"]:
+            return
+        page += 1
@@ -1,12 +1,12 @@
 import os
-import azure.cognitiveservices.speech as speechsdk
 import streamlit as st
-from resume_service import generate_resume
-from embedding_service import generate_embedding, store_embedding
-from azure_blob_storage import AzureBlobStorage
-from azure.search.documents import SearchClient
-from azure.core.credentials import AzureKeyCredential
-from search_service import search_candidates
+import app_resources
+import instrumentation
+
+LIVE_TRANSCRIPT_REFRESH_SECONDS = 1
+
+# The Speech SDK, Azure clients and services are imported where they are first used, so
+# the first render and every rerun only pay for Streamlit itself.
 
 # result_data = search_candidates(query_text="Who makes a good engineer??")
 # # Show answers
@@ -17,15 +17,13 @@ from search_service import search_candidates
 # for doc in result_data["documents"]:
 #     print(doc["id"], doc["reranker_score"], doc["content"][:100], doc["caption"])
 
-# Instantiate AzureBlobStorage
-
-blob_storage = AzureBlobStorage()
-
 def recognize_from_microphone():
     """
     1. Listen to speech for candidate info.
     2. Translate/detect language to English (existing behavior, left unchanged).
     """
+    import azure.cognitiveservices.speech as speechsdk
+
     speech_config = speechsdk.SpeechConfig(
         subscription=os.environ.get('SPEECH_KEY'),
         region=os.environ.get('SPEECH_REGION')
@@ -42,7 +40,8 @@ def recognize_from_microphone():
     st.info("Listening...")
 
     # Perform speech recognition asynchronously and wait for the result
-    speech_recognition_result = speech_recognizer.recognize_once_async().get()
+    with instrumentation.span("speech_recognition", mode="microphone"):
+        speech_recognition_result = speech_recognizer.recognize_once_async().get()
 
     # Check the result of the speech recognition
     if speech_recognition_result.reason == speechsdk.ResultReason.RecognizedSpeech:
@@ -61,6 +60,22 @@ def recognize_from_microphone():
             st.write(cancellation_details.error_details)
             st.warning("Did you set the speech resource key and region values?")
 
+def show_transcript(transcript):
+    st.write(transcript.live_text)
+    if transcript.truncated:
+        st.warning("The transcript reached its size limit; later speech was not kept.")
+    if transcript.error:
+        st.error(f"Speech Recognition canceled: {transcript.error}")
+
+# While listening, only the transcript is re-rendered, every LIVE_TRANSCRIPT_REFRESH_SECONDS,
+# so partial results stream in without rerunning the whole page
+show_live_transcript = st.fragment(run_every=LIVE_TRANSCRIPT_REFRESH_SECONDS)(show_transcript)
+
+# Expose metrics at METRICS_PORT when METRICS_ENABLED is set, and start loading the resume
+# services in the background; both happen once per process.
+app_resources.metrics_server()
+app_resources.prewarm()
+
 # Streamlit UI
 st.markdown(
     """
@@ -101,6 +116,42 @@ st.write("### Option 2: Use Speech Recognition")
 if st.button("Start Speech Recognition"):
     recognize_from_microphone()
 
+# Option 3: Continuous Speech Recognition for long interviews
+st.write("### Option 3: Record a Full Interview")
+live_recognizer = st.session_state.get("live_recognizer")
+if live_recognizer is None:
+    if st.button("Start Continuous Recognition"):
+        from transcription_service import ContinuousRecognizer
+        live_recognizer = ContinuousRecognizer()
+        live_recognizer.start()
+        st.session_state.live_recognizer = live_recognizer
+        st.rerun()
+else:
+    transcript = live_recognizer.transcript
+    st.info("Listening... the transcript updates as you speak. Click Stop when the interview is over.")
+    if st.button("Stop Continuous Recognition"):
+        st.session_state.recognized_text = live_recognizer.stop()
+        del st.session_state.live_recognizer
+        show_transcript(transcript)
+    else:
+        show_live_transcript(transcript)
+
+# Option 4: Transcribe a recorded interview
+st.write("### Option 4: Upload a Recorded Interview (WAV)")
+audio_file = st.file_uploader("Upload a WAV recording:", type=["wav"])
+if audio_file is not None and st.button("Transcribe Recording"):
+    try:
+        from transcription_service import transcribe_wav_file
+        with st.spinner("Transcribing..."):
+            with instrumentation.span("speech_recognition", mode="file") as span:
+                st.session_state.recognized_text = transcribe_wav_file(audio_file)
+                span.set("bytes", audio_file.size)
+            instrumentation.count("speech_audio_bytes_total", audio_file.size, mode="file")
+        st.success("Recognized Speech:")
+        st.write(st.session_state.recognized_text)
+    except Exception as e:
+        st.error(f"Failed to transcribe recording: {e}")
+
 # Always show email and phone inputs, with default fallback
 st.write("### Candidate Contact Info (Optional)")
 email = st.text_input("Email address:", value="jobcoach@resume.com", key="email_input")
@@ -113,22 +164,51 @@ if st.button("Generate Resume", key="generate_resume_button"):
         st.error("No input text found. Please perform speech recognition or enter text manually.")
     else:
         try:
-            # Generate the resume
-            resume_text = generate_resume(input_text, email=email, phone=phone)
+            from resume_service import generate_resume_stream
+            from resume_pipeline import persist_resume
+            from transcript_condenser import needs_condensing
+
+            # Generate the resume, rendering it as it streams in
+            preview = st.empty()
+            truncation_notices = []
+            stream = generate_resume_stream(input_text, email=email, phone=phone,
+                                            on_truncated=truncation_notices.append)
+            with instrumentation.span("resume_generation"):
+                # Nothing streams while a long transcript is condensed or the model starts up
+                waiting = ("Condensing the long transcript..." if needs_condensing(input_text)
+                           else "Generating resume...")
+                with st.spinner(waiting):
+                    resume_text = next(stream, "")
+                preview.text(resume_text)
+                for delta in stream:
+                    resume_text += delta
+                    preview.text(resume_text)
+            preview.empty()
+            for notice in truncation_notices:
+                st.warning(notice)
 
             if resume_text.strip():
-                # 1. Store the plain-text resume in Blob Storage
-                blob_storage.store_resume(email, resume_text)
-
-                # 2. Generate and store the embedding for future searches
-                embedding = generate_embedding(resume_text)
-                store_embedding(email=email, embedding=embedding, resume_url="")
+                # Store the resume and its embedding in the background
+                st.session_state.persist_run = persist_resume(email, resume_text)
 
             st.session_state.generated_resume = resume_text
             st.success("Resume Generated Successfully!")
         except Exception as e:
             st.error(f"Failed to generate resume: {e}")
 
+# Report on the background save of the last generated resume
+if "persist_run" in st.session_state:
+    persist_run = st.session_state.persist_run
+    if persist_run.status == "running":
+        st.info("Saving resume and embedding in the background...")
+        st.button("Refresh save status", key="refresh_persist_status")
+    elif persist_run.status == "succeeded":
+        st.success("Resume and embedding saved for future searches.")
+    else:
+        for stage_name, stage in persist_run.stages.items():
+            if stage["status"] != "succeeded":
+                st.error(f"Saving failed at {stage_name}: {stage['error']}")
+
 # Display the generated resume if it exists
 if "generated_resume" in st.session_state:
     st.write("### Generated Resume")
@@ -0,0 +1,16 @@
+from benchmarks.fakes import FakeOpenAIServer, ServiceProfile
+from resume_service import generate_resume_stream
+
+
+def test_stream_decodes_non_ascii_deltas_as_utf8(monkeypatch):
+    resume_text = "José Müller — café, Straße 5, 東京"
+    server = FakeOpenAIServer(ServiceProfile(latency_ms=0, jitter_ms=0), token_ms=0, resume_text=resume_text).start()
+    try:
+        monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", server.endpoint)
+        monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test")
+        monkeypatch.setenv("AZURE_OPENAI_RESUME_DEPLOYMENT_NAME", "resume")
+        streamed = "".join(generate_resume_stream("Candidate story"))
+    finally:
+        server.stop()
+
+    assert streamed.strip() == resume_text
@@ -0,0 +1,212 @@
+import os
+import json
+import re
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+import azure_openai_client
+import instrumentation
+
+DEFAULT_CONDENSE_THRESHOLD_CHARS = 16000
+DEFAULT_CHUNK_CHARS = 12000
+DEFAULT_CHUNK_OVERLAP_CHARS = 200
+DEFAULT_MAX_WORKERS = 16
+# When condensing fails the transcript is used as is, cut to this length
+DEFAULT_FALLBACK_CHARS = 48000
+FACT_LISTS = ("skills", "achievements", "experience", "education")
+CONTACT_FIELDS = ("email", "phone", "location")
+
+
+
+class TranscriptTruncatedWarning(UserWarning):
+    """
+    Condensing failed and only the start of the transcript was used for the resume.
+    """
+
+
+_executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="transcript-condenser")
+
+EXTRACTION_PROMPT = """
+Extract facts about the candidate from this part of a job coaching interview transcript.
+Respond with a JSON object with these keys:
+- "name": the candidate's name, or ""
+- "contact": an object with "email", "phone" and "location" ("" when not mentioned)
+- "skills": short skill phrases, including soft and hidden skills shown in the stories
+- "achievements": concrete accomplishments, with numbers where given
+- "experience": one entry per role, e.g. "Warehouse operative at Acme, 2019-2022: picking, forklift"
+- "education": schooling, courses and certifications
+Only include facts stated in the text. Keep each entry short.
+
+Transcript part:
+{chunk}
+"""
+
+
+def _condense_settings():
+    endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
+    api_key = os.environ.get("AZURE_OPENAI_API_KEY")
+    # A smaller, cheaper deployment can do the extraction; default to the resume deployment
+    deployment_name = (os.environ.get("AZURE_OPENAI_CONDENSE_DEPLOYMENT_NAME")
+                       or os.environ.get("AZURE_OPENAI_RESUME_DEPLOYMENT_NAME"))
+
+    if not endpoint or not api_key or not deployment_name:
+        raise ValueError("Azure OpenAI environment variables are not set correctly.")
+    return endpoint, api_key, deployment_name
+
+
+def split_transcript(text, chunk_chars=DEFAULT_CHUNK_CHARS, overlap_chars=DEFAULT_CHUNK_OVERLAP_CHARS):
+    """
+    Split text into chunks of at most chunk_chars, breaking at a paragraph, sentence or
+    word boundary where possible. Consecutive chunks overlap by about overlap_chars so a
+    fact spanning a boundary is seen whole by at least one chunk.
+    """
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            window = text[start + chunk_chars // 2:end]
+            for pattern in (r"\n\s*\n", r"[.!?]\s", r"\s"):
+                matches = list(re.finditer(pattern, window))
+                if matches:
+                    end = start + chunk_chars // 2 + matches[-1].end()
+                    break
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap_chars, start + 1)
+    return [chunk for chunk in chunks if chunk]
+
+
+def _extract_facts(chunk):
+    """
+    Ask the model for the candidate facts in one chunk, as a dictionary.
+    """
+    endpoint, api_key, deployment_name = _condense_settings()
+    api_url = f"{endpoint}openai/deployments/{deployment_name}/chat/completions?api-version=2025-01-01-preview"
+    headers = {
+        "Content-Type": "application/json",
+        "api-key": api_key
+    }
+    payload = {
+        "messages": [
+            {"role": "system", "content": "You extract structured facts for resume writing and reply in JSON."},
+            {"role": "user", "content": EXTRACTION_PROMPT.format(chunk=chunk)}
+        ],
+        "temperature": 0,
+        "response_format": {"type": "json_object"}
+    }
+
+    response = azure_openai_client.post(deployment_name, api_url, headers, payload)
+    if response.status_code != 200:
+        raise Exception(f"Failed to condense transcript. Error: {response.status_code} - {response.text}")
+
+    response_data = response.json()
+    instrumentation.record_token_usage(deployment_name, response_data.get("usage"))
+    try:
+        facts = json.loads(response_data["choices"][0]["message"]["content"])
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        raise Exception(f"Failed to condense transcript: the model did not return JSON ({e}).")
+    if not isinstance(facts, dict) or "error" in facts:
+        raise Exception(f"Failed to condense transcript: unexpected reply {str(facts)[:200]}")
+    return facts
+
+
+def _as_list(value):
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    if isinstance(value, str) and value.strip():
+        return [value.strip()]
+    return []
+
+
+def merge_facts(chunk_facts):
+    """
+    Merge per-chunk facts in transcript order. List entries are de-duplicated
+    case-insensitively (overlapping chunks repeat facts); for the name and each contact
+    field the first non-empty value wins.
+    """
+    merged = {"name": "", "contact": {field: "" for field in CONTACT_FIELDS}}
+    merged.update({key: [] for key in FACT_LISTS})
+    seen = {key: set() for key in FACT_LISTS}
+
+    for facts in chunk_facts:
+        if not merged["name"] and isinstance(facts.get("name"), str):
+            merged["name"] = facts["name"].strip()
+        contact = facts.get("contact") if isinstance(facts.get("contact"), dict) else {}
+        for field in CONTACT_FIELDS:
+            if not merged["contact"][field] and contact.get(field):
+                merged["contact"][field] = str(contact[field]).strip()
+        for key in FACT_LISTS:
+            for item in _as_list(facts.get(key)):
+                normalized = " ".join(item.lower().split())
+                if normalized not in seen[key]:
+                    seen[key].add(normalized)
+                    merged[key].append(item)
+    return merged
+
+
+def format_brief(facts, source_chars):
+    """
+    Render merged facts as the compact plain-text brief used in the resume prompt.
+    """
+    lines = [f"Candidate brief (condensed from a {source_chars}-character interview transcript):"]
+    if facts["name"]:
+        lines.append(f"Name: {facts['name']}")
+    contact = ", ".join(f"{field}: {value}" for field, value in facts["contact"].items() if value)
+    if contact:
+        lines.append(f"Contact: {contact}")
+    if facts["skills"]:
+        lines.append("Skills: " + "; ".join(facts["skills"]))
+    for key, title in (("achievements", "Achievements"), ("experience", "Work experience"),
+                       ("education", "Education and certifications")):
+        if facts[key]:
+            lines.append(f"{title}:")
+            lines.extend(f"- {item}" for item in facts[key])
+    return "\n".join(lines)
+
+
+def needs_condensing(text, threshold_chars=None):
+    """
+    Whether condense_transcript would condense text rather than return it unchanged.
+    """
+    threshold_chars = threshold_chars or int(
+        os.environ.get("RESUME_CONDENSE_THRESHOLD_CHARS", DEFAULT_CONDENSE_THRESHOLD_CHARS)
+    )
+    return len(text) > threshold_chars
+
+
+def condense_transcript(text, threshold_chars=None, chunk_chars=None, on_truncated=None):
+    """
+    Reduce a long interview transcript to a compact candidate brief before resume
+    generation: the text is split into chunks, facts are extracted from all chunks
+    concurrently, and the merged facts are formatted as a brief. Texts up to
+    threshold_chars (RESUME_CONDENSE_THRESHOLD_CHARS) are returned unchanged. If
+    condensing fails for any reason the resume is generated from the original text,
+    cut to RESUME_CONDENSE_FALLBACK_CHARS. When that drops part of the interview,
+    on_truncated(message) is called, or a TranscriptTruncatedWarning issued without it.
+    """
+    if not needs_condensing(text, threshold_chars):
+        return text
+
+    chunk_chars = chunk_chars or int(os.environ.get("RESUME_CONDENSE_CHUNK_CHARS", DEFAULT_CHUNK_CHARS))
+    chunks = split_transcript(text, chunk_chars)
+    with instrumentation.span("condense_transcript") as span:
+        span.set("chars", len(text))
+        span.set("chunks", len(chunks))
+        try:
+            chunk_facts = list(_executor.map(_extract_facts, chunks))
+            brief = format_brief(merge_facts(chunk_facts), len(text))
+        except Exception as e:
+            fallback_chars = int(os.environ.get("RESUME_CONDENSE_FALLBACK_CHARS", DEFAULT_FALLBACK_CHARS))
+            span.set("fallback", str(e))
+            instrumentation.count("condense_fallback_total")
+            if len(text) > fallback_chars:
+                message = (f"Condensing the transcript failed ({e}); the resume was generated from the first "
+                           f"{fallback_chars} of {len(text)} characters, the rest of the interview was left out.")
+                if on_truncated:
+                    on_truncated(message)
+                else:
+                    warnings.warn(TranscriptTruncatedWarning(message), stacklevel=2)
+            return text[:fallback_chars]
+        span.set("brief_chars", len(brief))
+    return brief
@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+import azure.cognitiveservices.speech as speechsdk
+import instrumentation
+
+DEFAULT_MAX_TRANSCRIPT_CHARS = 200000
+DEFAULT_CHUNK_SECONDS = 60
+DEFAULT_FILE_WORKERS = 4
+# Longest wait for a chunk's recognition to finish: this many seconds plus twice the audio length
+DEFAULT_CHUNK_TIMEOUT_SECONDS = 60
+
+
+def _speech_config():
+    speech_config = speechsdk.SpeechConfig(
+        subscription=os.environ.get('SPEECH_KEY'),
+        region=os.environ.get('SPEECH_REGION')
+    )
+    speech_config.speech_recognition_language = "en-US"
+    return speech_config
+
+
+class LiveTranscript:
+    """
+    Transcript shared between Speech SDK callback threads and the UI.
+    Final segments are appended in order; partial hypotheses overwrite each other, so at
+    most one pending partial is ever buffered. Once max_chars of final text is held, new
+    segments are dropped and `truncated` is set rather than growing without bound.
+    """
+
+    def __init__(self, max_chars=DEFAULT_MAX_TRANSCRIPT_CHARS):
+        self.max_chars = max_chars
+        self.segments = []
+        self.partial = ""
+        self.truncated = False
+        self.running = False
+        self.error = None
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def set_partial(self, text):
+        with self._lock:
+            self.partial = text
+
+    def add_final(self, text):
+        with self._lock:
+            self.partial = ""
+            if not text:
+                return
+            if self._chars + len(text) > self.max_chars:
+                self.truncated = True
+                return
+            self.segments.append(text)
+            self._chars += len(text) + 1
+
+    @property
+    def text(self):
+        """
+        Final text recognized so far.
+        """
+        with self._lock:
+            return " ".join(self.segments)
+
+    @property
+    def live_text(self):
+        """
+        Final text followed by the current partial hypothesis, for display.
+        """
+        with self._lock:
+            return " ".join(self.segments + ([self.partial] if self.partial else []))
+
+
+def _connect(recognizer, transcript, done=None):
+    """
+    Route recognizer events into transcript; set done (if given) when the session ends.
+    """
+    def on_recognizing(evt):
+        transcript.set_partial(evt.result.text)
+
+    def on_recognized(evt):
+        if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            transcript.add_final(evt.result.text)
+
+    def on_canceled(evt):
+        if evt.cancellation_details.reason == speechsdk.CancellationReason.Error:
+            transcript.error = evt.cancellation_details.error_details
+        transcript.running = False
+        if done:
+            done.set()
+
+    def on_stopped(evt):
+        transcript.running = False
+        if done:
+            done.set()
+
+    recognizer.recognizing.connect(on_recognizing)
+    recognizer.recognized.connect(on_recognized)
+    recognizer.canceled.connect(on_canceled)
+    recognizer.session_stopped.connect(on_stopped)
+
+
+class ContinuousRecognizer:
+    """
+    Continuous microphone recognition: unlike recognize_once_async(), keeps listening
+    across pauses until stop() is called, streaming results into a LiveTranscript.
+    """
+
+    def __init__(self, transcript=None):
+        self.transcript = transcript or LiveTranscript()
+        self._recognizer = None
+        self._started = None
+
+    def start(self):
+        audio_config = speechsdk.audio.AudioConfig(use_default_microphone=True)
+        self._recognizer = speechsdk.SpeechRecognizer(speech_config=_speech_config(), audio_config=audio_config)
+        _connect(self._recognizer, self.transcript)
+        self.transcript.running = True
+        self._recognizer.start_continuous_recognition_async().get()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        """
+        Stop listening and return the final transcript.
+        """
+        if self._recognizer is not None:
+            self._recognizer.stop_continuous_recognition_async().get()
+            self._recognizer = None
+            instrumentation.observe("speech_session", time.perf_counter() - self._started, mode="continuous")
+        self.transcript.running = False
+        return self.transcript.text
+
+
+def _transcribe_frames(frames, sample_rate, sample_width, channels):
+    """
+    Transcribe one chunk of raw PCM frames with continuous recognition over a push stream.
+    """
+    stream_format = speechsdk.audio.AudioStreamFormat(
+        samples_per_second=sample_rate, bits_per_sample=sample_width * 8, channels=channels
+    )
+    stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+    recognizer = speechsdk.SpeechRecognizer(
+        speech_config=_speech_config(),
+        audio_config=speechsdk.audio.AudioConfig(stream=stream)
+    )
+
+    transcript = LiveTranscript(max_chars=float("inf"))
+    done = threading.Event()
+    _connect(recognizer, transcript, done)
+    audio_seconds = len(frames) / (sample_rate * sample_width * channels)
+    timeout = float(os.environ.get("SPEECH_CHUNK_TIMEOUT_SECONDS", DEFAULT_CHUNK_TIMEOUT_SECONDS)) + 2 * audio_seconds
+
+    with instrumentation.span("speech_chunk"):
+        recognizer.start_continuous_recognition_async().get()
+        stream.write(frames)
+        stream.close()
+        finished = done.wait(timeout)
+        recognizer.stop_continuous_recognition_async().get()
+
+    if not finished:
+        raise Exception(f"Speech Recognition timed out after {timeout:.0f}s on a {audio_seconds:.0f}s chunk.")
+
+    if transcript.error:
+        raise Exception(f"Speech Recognition canceled: {transcript.error}")
+    return transcript.text
+
+
+def transcribe_wav_file(wav_file, chunk_seconds=DEFAULT_CHUNK_SECONDS, max_workers=DEFAULT_FILE_WORKERS):
+    """
+    Transcribe an uploaded PCM WAV file (path or file-like object) by splitting it into
+    chunks of chunk_seconds and recognizing the chunks in parallel. Returns the chunk
+    transcripts joined in order. Words spanning a chunk boundary may be split.
+    """
+    with wave.open(wav_file, "rb") as wav:
+        sample_rate = wav.getframerate()
+        sample_width = wav.getsampwidth()
+        channels = wav.getnchannels()
+        frames_per_chunk = int(sample_rate * chunk_seconds)
+
+        chunks = []
+        while True:
+            frames = wav.readframes(frames_per_chunk)
+            if not frames:
+                break
+            chunks.append(frames)
+
+    if not chunks:
+        return ""
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        texts = list(executor.map(lambda frames: _transcribe_frames(frames, sample_rate, sample_width, channels), chunks))
+    return " ".join(text for text in texts if text)
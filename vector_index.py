@@ -0,0 +1,166 @@
+import json
+import os
+import shutil
+import time
+import numpy as np
+
+VECTORS_FILE = "vectors.f32"
+METADATA_FILE = "metadata.json"
+# Names the version subdirectory holding the current vectors and metadata
+CURRENT_FILE = "CURRENT"
+LOAD_ATTEMPTS = 3
+
+
+def _normalize_rows(matrix):
+    """
+    L2-normalize every row in place so cosine similarity becomes a plain dot product.
+    Zero rows are left as zeros instead of producing NaNs.
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+class VectorIndex:
+    """
+    Local candidate index: a contiguous float32 matrix of pre-normalized embeddings
+    (memory-mapped from disk when loaded) plus an id/email/resume_url sidecar.
+    """
+
+    def __init__(self, vectors, records):
+        if len(vectors) != len(records):
+            raise ValueError("Vector index rows and records must have the same length.")
+        self.vectors = vectors
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1] if self.vectors.ndim == 2 else 0
+
+    @classmethod
+    def build(cls, embeddings):
+        """
+        Build an index from embedding dicts as returned by download_all_embeddings().
+        """
+        embeddings = list(embeddings)
+        if not embeddings:
+            return cls(np.zeros((0, 0), dtype=np.float32), [])
+        return cls.from_vectors([item["embedding"] for item in embeddings], embeddings)
+
+    @classmethod
+    def from_vectors(cls, vectors, records):
+        """
+        Build an index from a (count, dim) matrix, e.g. one read from binary shards.
+        """
+        vectors = np.array(vectors, dtype=np.float32, order="C", copy=True)
+        _normalize_rows(vectors)
+        return cls(vectors, [
+            {
+                "id": record.get("id") or record.get("email", ""),
+                "email": record.get("email", ""),
+                "resume_url": record.get("resume_url", "")
+            }
+            for record in records
+        ])
+
+    def save(self, index_dir):
+        """
+        Write the matrix and sidecar to a new version subdirectory of index_dir, then
+        switch the CURRENT pointer to it with a single atomic rename, so a reader always
+        sees a matching pair. Older versions are removed, except the one just replaced,
+        which a concurrent load() may still be opening.
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        previous = _current_version(index_dir)
+        version = f"v{time.time_ns()}"
+        version_dir = os.path.join(index_dir, version)
+        os.makedirs(version_dir)
+
+        np.ascontiguousarray(self.vectors, dtype=np.float32).tofile(os.path.join(version_dir, VECTORS_FILE))
+        metadata = {
+            "count": len(self.records),
+            "dim": self.dim,
+            "records": self.records
+        }
+        with open(os.path.join(version_dir, METADATA_FILE), "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+        pointer_path = os.path.join(index_dir, CURRENT_FILE)
+        with open(pointer_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(pointer_path + ".tmp", pointer_path)
+
+        for name in os.listdir(index_dir):
+            path = os.path.join(index_dir, name)
+            if name in (version, previous) or not (name[:1] == "v" and name[1:].isdigit() and os.path.isdir(path)):
+                continue
+            # Memory-mapped files stay readable after removal on POSIX; Windows keeps them
+            shutil.rmtree(path, ignore_errors=True)
+        # Files of an index saved before versioning
+        for name in (VECTORS_FILE, METADATA_FILE):
+            if os.path.exists(os.path.join(index_dir, name)):
+                os.remove(os.path.join(index_dir, name))
+
+    @classmethod
+    def load(cls, index_dir):
+        """
+        Memory-map the current version written by save(). Only the sidecar is parsed;
+        vector pages are faulted in by the OS on first use.
+        """
+        for attempt in range(LOAD_ATTEMPTS):
+            version = _current_version(index_dir)
+            version_dir = os.path.join(index_dir, version) if version else index_dir
+            metadata_path = os.path.join(version_dir, METADATA_FILE)
+            try:
+                with open(metadata_path, "r", encoding="utf-8") as f:
+                    metadata = json.load(f)
+                count, dim = metadata["count"], metadata["dim"]
+                if count == 0:
+                    vectors = np.zeros((0, dim), dtype=np.float32)
+                else:
+                    vectors = np.memmap(os.path.join(version_dir, VECTORS_FILE), dtype=np.float32,
+                                        mode="r", shape=(count, dim))
+                return cls(vectors, metadata["records"])
+            except FileNotFoundError:
+                # Unversioned and missing means there is no index; otherwise two saves
+                # replaced the version between reading CURRENT and opening its files
+                if version is None or attempt == LOAD_ATTEMPTS - 1:
+                    break
+        raise FileNotFoundError(f"No vector index found in {index_dir}.")
+
+    def search(self, query_embedding, top_k=5):
+        """
+        Return the top_k records by cosine similarity to query_embedding, best first.
+        Scoring is a single matrix-vector product followed by argpartition.
+        """
+        if len(self.records) == 0 or top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (self.dim,):
+            raise ValueError(f"Query has dimension {query.shape}, index expects ({self.dim},).")
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = self.vectors @ query
+        top_k = min(top_k, len(scores))
+        if top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(scores))
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [dict(self.records[i], score=float(scores[i])) for i in order]
+
+
+def _current_version(index_dir):
+    try:
+        with open(os.path.join(index_dir, CURRENT_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None